@@ -1,128 +1,8 @@
+import os
 import streamlit as st
-from typing import List, Set, Union
-from collections import defaultdict
-from functools import wraps
-from datetime import datetime
-import pandas as pd
-
-
-def timed(func):
-    @wraps(func)
-    def timed_func(*args, **kwargs):
-        start_time = datetime.now()
-        ret = func(*args, **kwargs)
-        print(f'{func.__name__} - {(datetime.now() - start_time).total_seconds():.4f}')
-        return ret
-    return timed_func
-
-class WordTrieNode:
-    def __init__(self, value: str, parent: Union['WordTrieNode', None]):
-        self.value = value
-        self.parent = parent
-        self.children = {}
-        self.valid = False
-
-    def get_word(self) -> str:
-        if self.parent is not None:
-            return self.parent.get_word() + self.value
-        else:
-            return self.value
-
-class LetterBoxed:
-    @timed
-    def __init__(self, input_string: str, dictionary: str, len_threshold=3):
-        # parse the input string (abc-def-ghi-jkl) into set of 4 sides
-        self.input_string = input_string.lower()
-        self.sides = {side for side in input_string.split('-')}
-        self.puzzle_letters = {letter for side in self.sides for letter in side}
-        self.len_threshold = len_threshold
-
-        # build trie from newline-delimited .txt word list
-        self.root = WordTrieNode('', None)
-        with open(dictionary) as f:
-            for line in f.readlines():
-                self.add_word(line.strip().lower())
-
-        # find all valid words in puzzle
-        self.puzzle_words = self.get_puzzle_words()
-
-        # puzzle_graph[starting_letter][ending_letter] = {{letters}: [words]}
-        # e.g. puzzle_graph['f']['s'] = {{'a','e','f','r','s'} : ['fares', 'fears', 'farers', 'fearers']}
-        self.puzzle_graph = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
-        for word in self.puzzle_words:
-            self.puzzle_graph[word[0]][word[-1]][frozenset(word)].append(word)
-
-    def add_word(self, word) -> None:
-        node = self.root
-        for char in word:
-            if char not in node.children:
-                node.children[char] = WordTrieNode(char, node)
-            node = node.children[char]
-        node.valid = True
-
-    def _puzzle_words_inner(self, node: WordTrieNode, last_side: str) -> List[WordTrieNode]:
-        valid_nodes = [node] if node.valid else []
-        if node.children:
-            for next_side in self.sides - {last_side}:
-                for next_letter in next_side:
-                    if next_letter in node.children:
-                        next_node = node.children[next_letter]
-                        valid_nodes += self._puzzle_words_inner(next_node, next_side)
-        return valid_nodes
-
-    @timed
-    def get_puzzle_words(self) -> List[str]:
-        all_valid_nodes = []
-        for starting_side in self.sides:
-            for starting_letter in starting_side:
-                if starting_letter in self.root.children:
-                    all_valid_nodes += self._puzzle_words_inner(self.root.children[starting_letter], starting_side)
-        return [node.get_word() for node in all_valid_nodes]
-
-    def _find_solutions_inner(self, path_words: List[List[str]], letters: Set[str], next_letter: str) -> List[List[List[str]]]:
-        if len(letters) == 12:
-            return [path_words]
-        elif len(path_words) == self.len_threshold:
-            return []
-
-        solutions = []
-        for last_letter in self.puzzle_graph[next_letter]:
-            for letter_edge, edge_words in self.puzzle_graph[next_letter][last_letter].items():
-                if letter_edge - letters:
-                    solutions += self._find_solutions_inner(path_words + [edge_words], letters | letter_edge, last_letter)
-        return solutions
-
-    @timed
-    def find_all_solutions(self) -> List[List[str]]:
-        all_solutions = []
-        for first_letter in self.puzzle_letters:
-            for last_letter in self.puzzle_letters:
-                for letter_edge, edge_words in self.puzzle_graph[first_letter][last_letter].items():
-                    all_solutions += self._find_solutions_inner([edge_words], letter_edge, last_letter)
-        return all_solutions
-
-    def generate_solutions(self):
-        for first_letter in self.puzzle_letters:
-            for last_letter in self.puzzle_letters:
-                for letter_edge, edge_words in self.puzzle_graph[first_letter][last_letter].items():
-                    yield from self._generate_solutions_inner([edge_words], letter_edge, last_letter)
-    
-    def _generate_solutions_inner(self, path_words, letters, next_letter):
-        if len(letters) == 12:
-            yield path_words
-        elif len(path_words) == self.len_threshold:
-            return
-        else:
-            for last_letter in self.puzzle_graph[next_letter]:
-                for letter_edge, edge_words in self.puzzle_graph[next_letter][last_letter].items():
-                    if letter_edge - letters:
-                        yield from self._generate_solutions_inner(
-                            path_words + [edge_words],
-                            letters | letter_edge,
-                            last_letter
-                        )
-
-
+from utils.letter_boxed import get_puzzle, puzzle_from_cursor
+# pandas and the Arrow solution tables (utils/letter_boxed_table.py) are imported where they are used, once
+# a puzzle is solved, so that opening the page stays cheap
 
 
 st.title("Letter Box Solver")
@@ -169,7 +49,10 @@ with bottom_cols[3]:
     letters[6] = st.text_input("Bottom-Right", max_chars=1, key="input-bottom-3")
 
 # Length of Threshold
-len_threshold = st.number_input("Threshold Length", min_value=1, step=1)
+len_threshold = st.number_input("Threshold Length", min_value=1, value=3, step=1)
+
+# Number of worker processes used by "Find all solutions"
+workers = st.number_input("Worker processes", min_value=1, max_value=os.cpu_count() or 1, value=1, step=1)
 
 # Solution Mode
 solution_mode = st.radio(
@@ -178,83 +61,111 @@ solution_mode = st.radio(
     index=1  # default to "Find all solutions"
 )
 
+DICTIONARY_PATH = 'pages/words_for_letter_boxed.txt'
+
+@st.cache_resource(max_entries=8, show_spinner="Solving the puzzle...")
+def cached_solutions_table(letters_split, len_threshold, _workers=1):
+    # one columnar table per puzzle, shared by every session of the process
+    from utils.letter_boxed_table import solutions_table
+    puzzle = get_puzzle(letters_split, DICTIONARY_PATH, len_threshold=len_threshold)
+    return solutions_table(puzzle, workers=_workers)
+
+@st.cache_resource(max_entries=8, show_spinner="Preparing export...")
+def cached_export(letters_split, len_threshold, file_format):
+    # built only when asked for, and shared (not copied) by every session and rerun
+    from utils.letter_boxed_table import export_solutions
+    puzzle = get_puzzle(letters_split, DICTIONARY_PATH, len_threshold=len_threshold)
+    return export_solutions(puzzle, cached_solutions_table(letters_split, len_threshold), file_format)
+
 # Add your Letter Box solver logic here
 if st.button("Solve"):
     # Check if all letters are filled
     if all(letter and letter.strip() for letter in letters):
         # Process the letters and solve the puzzle
         letters_split = "-".join(["".join(letters[i:i+3]) for i in range(0, 12, 3)]).lower()
-        dictionary_path = 'pages/words_for_letter_boxed.txt'
+        dictionary_path = DICTIONARY_PATH
 
         
 
         if solution_mode == "Find first solution":
-            # Store parameters to reinitialize LetterBoxed later
-            st.session_state['letters_split'] = letters_split
-            st.session_state['len_threshold'] = len_threshold
-            st.session_state['solution_gen'] = None  # will be initialized later
+            # The session only keeps a small cursor; puzzles are shared by every session in the process
+            puzzle = get_puzzle(letters_split, dictionary_path, len_threshold=len_threshold)
+            st.session_state['solution_cursor'] = puzzle.cursor()
             st.session_state['displayed_solutions'] = []
             st.session_state['first_solution_ready'] = True
+            st.session_state.pop('all_solutions_key', None)
 
-            # Lazily reinitialize puzzle and generator
-            puzzle = LetterBoxed(
-                st.session_state['letters_split'],
-                'pages/words_for_letter_boxed.txt',
-                len_threshold=st.session_state['len_threshold']
-            )
-            st.session_state['solution_gen'] = puzzle.generate_solutions()
-
-            try:
-                gen = st.session_state['solution_gen']
-                next_solution = next(gen)
-                st.session_state['displayed_solutions'].append(next_solution)
-            except StopIteration:
+            next_solutions, st.session_state['solution_cursor'] = puzzle.next_solutions(st.session_state['solution_cursor'])
+            if next_solutions:
+                st.session_state['displayed_solutions'] += next_solutions
+            else:
                 st.info("No more solutions found.")
 
         else:
-            st.write("Solving the puzzle with the given letters: ", letters_split)
-
-            puzzle = LetterBoxed(letters_split, dictionary_path, len_threshold=len_threshold)
-            st.write(len(puzzle.puzzle_words), "valid words found")
-            
-            meta_solutions = puzzle.find_all_solutions()
-            st.write(len(meta_solutions), "meta-solutions (meaningfully distinct paths)")
-            full_count = 0
-            for meta_solution in meta_solutions:
-                count = 1
-                for element in meta_solution:
-                    count *= len(element)
-                full_count += count
-            st.write(full_count, "total solutions (unique combinations/orders of words)")
-            # Display meta-solutions in table form
-            rows = []
-            for idx, meta_solution in enumerate(meta_solutions):
-                path_str = " → ".join(["/".join(word_group) for word_group in meta_solution])
-                
-                # Optional: compute number of combinations for this path
-                combinations = 1
-                for group in meta_solution:
-                    combinations *= len(group)
-
-                rows.append({
-                    "#": idx + 1,
-                    "Meta-Solution Path": path_str,
-                    "Combinations": combinations
-                })
-
-            # Convert to DataFrame and display
-            df = pd.DataFrame(rows)
-            st.dataframe(df, use_container_width=True)
+            # Results are rendered below from a shared Arrow table, so that paging and sorting survive reruns
+            st.session_state['all_solutions_key'] = (letters_split, len_threshold)
     else:
         st.error("Please fill in all the cells before solving.")
 
+if st.session_state.get('all_solutions_key'):
+    import pandas as pd
+    from utils.letter_boxed_table import SORT_COLUMNS, format_paths, sorted_page
+    solved_letters, solved_threshold = st.session_state['all_solutions_key']
+    st.write("Solving the puzzle with the given letters: ", solved_letters)
+
+    puzzle = get_puzzle(solved_letters, DICTIONARY_PATH, len_threshold=solved_threshold)
+    st.write(len(puzzle.puzzle_words), "valid words found")
+
+    meta_count, full_count = puzzle.count_solutions()
+    st.write(meta_count, "meta-solutions (meaningfully distinct paths)")
+    st.write(full_count, "total solutions (unique combinations/orders of words)")
+    table = cached_solutions_table(solved_letters, solved_threshold, workers)
+
+    # Display one server-side page of meta-solutions in table form
+    sort_cols = st.columns([2, 1, 1, 1])
+    with sort_cols[0]:
+        sort_label = st.selectbox("Sort by", list(SORT_COLUMNS), key="all_solutions_sort")
+    with sort_cols[1]:
+        descending = st.checkbox("Descending", key="all_solutions_descending")
+    with sort_cols[2]:
+        page_size = st.selectbox("Rows per page", [50, 100, 500], index=1, key="all_solutions_page_size")
+    n_pages = max(1, -(-table.num_rows // page_size))
+    with sort_cols[3]:
+        page = st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1, key="all_solutions_page")
+
+    page_table = sorted_page(table, SORT_COLUMNS[sort_label], descending, page - 1, page_size)
+    df = pd.DataFrame({
+        "#": page_table.column("index").to_pylist(),
+        "Meta-Solution Path": format_paths(puzzle, page_table.column("edge_ids").to_pylist()),
+        "Combinations": page_table.column("combinations").to_pylist(),
+    })
+    st.dataframe(df, use_container_width=True, hide_index=True)
+    st.caption(f"Page {page} of {n_pages}")
+
+    export_cols = st.columns([1, 1])
+    with export_cols[0]:
+        export_format = st.radio("Export format", ["parquet", "csv"], horizontal=True, key="all_solutions_export_format")
+    export_key = (solved_letters, solved_threshold, export_format)
+    with export_cols[1]:
+        # formatting every solution is only worth it once the user wants the file
+        export_slot = st.empty()
+        if st.session_state.get('export_key') != export_key and export_slot.button("Prepare export"):
+            st.session_state['export_key'] = export_key
+        if st.session_state.get('export_key') == export_key:
+            export_slot.download_button(
+                "Export all solutions",
+                data=cached_export(solved_letters, solved_threshold, export_format),
+                file_name=f"letter_boxed_{solved_letters}.{export_format}",
+            )
+
 if st.session_state.get('first_solution_ready'):
     if st.button("Display another solution"):
-        try:
-            gen = st.session_state['solution_gen']
-            next_solution = next(gen)
-            st.session_state['displayed_solutions'].append(next_solution)
-        except StopIteration:
+        cursor = st.session_state['solution_cursor']
+        puzzle = puzzle_from_cursor(cursor, DICTIONARY_PATH)
+        next_solutions, st.session_state['solution_cursor'] = puzzle.next_solutions(cursor)
+        if next_solutions:
+            st.session_state['displayed_solutions'] += next_solutions
+        else:
             st.info("No more solutions found.")
 
     # Prepare the table data as a list of dicts of string-formatted paths
@@ -267,5 +178,6 @@ if st.session_state.get('first_solution_ready'):
 
     # Display the one-solution-at-a-time table
     if solution_rows:
+        import pandas as pd
         df = pd.DataFrame(solution_rows)
         st.dataframe(df, use_container_width=True)
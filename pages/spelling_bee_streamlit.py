@@ -1,11 +1,28 @@
 import streamlit as st
-from utils.spelling_bee_agent import spelling_bee_reply, message_to_HumanMessage, message_to_AIMessage
+from utils.spelling_bee_agent import stream_spelling_bee, render_solution
+from utils.agent_runtime import ModelNotConfiguredError
+from utils.spelling_bee_cache import cache_stats
+from utils.agent_trace import node_stats
 
 
 spelling_bee_intro = "Have a tricky puzzle on your hands? Just provide the seven letters from today’s Spelling Bee — one center letter and six outer letters — and our AI agent will solve it for you providing all the valid words. (e.g. [A, [B, C, D, E, F, G]])"
 
+def reply_tokens(prefix, messages, solutions):
+    """
+    Yields the text of the reply for st.write_stream and collects the full tool results into solutions.
+    """
+    yield prefix
+    for kind, value in stream_spelling_bee(messages):
+        if kind == "token":
+            yield value
+        elif kind == "solution":
+            solutions.append(value)
+
 if "messages" not in st.session_state:
     st.session_state.messages = []
+if "solutions" not in st.session_state:
+    # full word lists of the tool calls, by index of the AI message; rendered here, never sent back to the model
+    st.session_state.solutions = {}
 
 # Display title
 st.title("Spelling Bee")
@@ -25,33 +42,54 @@ with st.form(key="sb_form"):
 # Reset game button
 if st.button("Reset Game"):
     st.session_state.messages = []
+    st.session_state.solutions = {}
     st.session_state.processed_input = None
     # Force update the placeholder
     messages_placeholder.markdown("<h2 style='text-align: center;'>Spelling Bee Mode</h2>", unsafe_allow_html=True)
     messages_placeholder.write("Game reset. Enter a new prompt.")
 
 # Display messages in the placeholder
-with messages_placeholder.container():
-    for i, msg in enumerate(st.session_state.messages):
-        if i % 2 == 0:
-            st.write(f"**You:** {msg.content if hasattr(msg, 'content') else msg}")
-        else:
-            st.write(f"**AI:** {msg.content if hasattr(msg, 'content') else msg}")
+if st.session_state.messages or (submit_button and SB_query):
+    history = messages_placeholder.container()
+    with history:
+        for i, msg in enumerate(st.session_state.messages):
+            if i % 2 == 0:
+                st.write(f"**You:** {msg['content']}")
+            else:
+                st.write(f"**AI:** {msg['content']}")
+                for artifact in st.session_state.solutions.get(i, []):
+                    st.markdown(render_solution(artifact))
 
 # Submit button
 if submit_button and SB_query:
-    # Store user query in messages
-    SB_query = message_to_HumanMessage(SB_query)
+    # Store user query in messages and append it to the conversation shown above; messages are plain
+    # role/content dicts, so the page never imports LangChain
+    SB_query = {"role": "human", "content": SB_query}
     st.session_state.messages.append(SB_query)
-    # Get AI response
-    ai_response = spelling_bee_reply(st.session_state.messages)
-    # Store AI response in messages
-    ai_response = message_to_AIMessage(ai_response)
-    st.session_state.messages.append(ai_response)
-    # Force update the placeholder
-    with messages_placeholder.container():
-        for i, msg in enumerate(st.session_state.messages):
-            if i % 2 == 0:
-                st.write(f"**You:** {msg.content if hasattr(msg, 'content') else msg}")
-            else:
-                st.write(f"**AI:** {msg.content if hasattr(msg, 'content') else msg}")
+    with history:
+        st.write(f"**You:** {SB_query['content']}")
+        # Stream the AI response as its tokens arrive, then store it in messages
+        ai_prefix = "**AI:** "
+        solutions = []
+        try:
+            ai_response = st.write_stream(reply_tokens(ai_prefix, st.session_state.messages, solutions))
+        except ModelNotConfiguredError as error:
+            # no model to answer with: show why and leave the question out of the conversation
+            st.session_state.messages.pop()
+            st.error(str(error))
+            ai_response = None
+        for artifact in solutions:
+            st.markdown(render_solution(artifact))
+    if ai_response is not None:
+        ai_response = {"role": "ai", "content": ai_response[len(ai_prefix):]}
+        if solutions:
+            st.session_state.solutions[len(st.session_state.messages)] = solutions
+        st.session_state.messages.append(ai_response)
+
+# Tool result / answer cache counters (see utils/spelling_bee_cache.py)
+with st.expander("Cache statistics"):
+    st.json(cache_stats())
+
+# Time and tokens spent in each agent node since the start of the process (see utils/agent_trace.py)
+with st.expander("Agent statistics"):
+    st.json(node_stats.stats())
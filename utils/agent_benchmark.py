@@ -0,0 +1,92 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+import numpy as np
+from langchain_core.messages import HumanMessage
+from utils import agent_runtime
+from utils.agent_models import FakeChatModel
+from utils.agent_trace import node_stats
+
+# Offline load test of the Spelling Bee agent: concurrent requests through the full graph, with the offline fake
+# model in place of the API, reporting request latency, per-node timings and the graph overhead.
+# Usage: python -m utils.agent_benchmark --requests 200 --concurrency 32 --latency 0.5 --output agent_benchmark.json
+
+PROMPT = "Please solve the Spelling Bee with center letter E and outer letters A G L N O Y"
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    values_ms = np.array(values) * 1000
+    if not len(values_ms):
+        return {"p50": None, "p99": None, "max": None}
+    return {"p50": float(np.percentile(values_ms, 50)), "p99": float(np.percentile(values_ms, 99)), "max": float(values_ms.max())}
+
+
+async def run_requests(n_requests: int, concurrency: int) -> List[Dict]:
+    """
+    Streams n_requests replies, at most concurrency at a time, and returns their traces.
+    """
+    from utils.spelling_bee_agent import astream_spelling_bee
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_request() -> Dict:
+        async with semaphore:
+            async for kind, value in astream_spelling_bee([HumanMessage(content=PROMPT)]):
+                if kind == "trace":
+                    return value
+
+    return await asyncio.gather(*(one_request() for _ in range(n_requests)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the Spelling Bee agent graph with the offline fake model.")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8, help="requests in flight at once")
+    parser.add_argument("--latency", type=float, default=0.5, help="simulated seconds before the first token of each model call")
+    parser.add_argument("--token-latency", type=float, default=0.02, help="simulated seconds between two streamed tokens")
+    parser.add_argument("--cache", action="store_true", help="keep the tool/answer cache on (off by default, every request reaches the model)")
+    parser.add_argument("--output", default="agent_benchmark.json")
+    args = parser.parse_args()
+
+    if not args.cache:
+        os.environ["SPELLING_BEE_CACHE"] = "off"
+    os.environ.setdefault("SPELLING_BEE_MODEL", "fake")
+    from utils.spelling_bee_agent import set_chat_model
+    set_chat_model(FakeChatModel(latency=args.latency, token_latency=args.token_latency))
+
+    start_time = time.perf_counter()
+    traces = agent_runtime.run(run_requests(args.requests, args.concurrency))
+    wall_time = time.perf_counter() - start_time
+
+    spans = [span for trace in traces for span in trace["spans"]]
+    results = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "model_latency_s": args.latency,
+        "token_latency_s": args.token_latency,
+        "wall_time_s": wall_time,
+        "requests_per_s": args.requests / wall_time,
+        "request_time_ms": percentiles([trace["duration"] for trace in traces]),
+        "overhead_time_ms": percentiles([trace["overhead"] for trace in traces]),
+        "node_time_ms": {node: percentiles([span["duration"] for span in spans if span["node"] == node]) for node in sorted({span["node"] for span in spans})},
+        "nodes": node_stats.stats(),
+        "limiter": agent_runtime.llm_limiter.stats(),
+    }
+    print(f"{args.requests} requests in {wall_time:.2f} s ({results['requests_per_s']:.1f}/s), "
+          f"request p50 {results['request_time_ms']['p50']:.1f} ms, p99 {results['request_time_ms']['p99']:.1f} ms, "
+          f"graph overhead p50 {results['overhead_time_ms']['p50']:.1f} ms")
+    for node, times in results["node_time_ms"].items():
+        print(f"  {node}: p50 {times['p50']:.1f} ms, p99 {times['p99']:.1f} ms, max {times['max']:.1f} ms")
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import asyncio
+import json
+import os
+import re
+import time
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from utils.agent_runtime import ModelNotConfiguredError, pooled_http_clients
+
+# Chat model backends of the agents. Configuration (environment variables, or a .env file read by make_chat_model):
+#   SPELLING_BEE_MODEL          "mistral" (default when MISTRAL_API_KEY is set) or "fake" (offline, only when chosen here)
+#   SPELLING_BEE_FAKE_LATENCY   seconds the fake model takes before its first token (default 0.5)
+#   SPELLING_BEE_FAKE_TOKEN_LATENCY  seconds between two streamed tokens of the fake model (default 0.02)
+
+MISTRAL_MODEL = "mistral-large-latest"
+FAKE_DEFAULT_PUZZLE = ("E", ["A", "G", "L", "N", "O", "Y"])
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic offline stand-in for the Spelling Bee agent's model: it calls spelling_bee_tool with the
+    letters found in the last user message, then answers with the first line of the tool result. Latency
+    is simulated (without blocking the event loop on the async paths) and token usage is estimated, so
+    load tests and traces behave like the real model without any network access.
+    """
+    latency: float = 0.5
+    token_latency: float = 0.02
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-spelling-bee"
+
+    def bind_tools(self, tools, **kwargs):
+        # the fake only knows spelling_bee_tool
+        return self
+
+    def _reply(self, messages: List[BaseMessage]) -> AIMessage:
+        input_tokens = sum(len(str(message.content)) for message in messages) // 4
+        if messages and isinstance(messages[-1], ToolMessage):
+            summary = str(messages[-1].content).split("\n", 1)[0]
+            content = f"The puzzle {summary}. The full word list is displayed above."
+            return AIMessage(content=content, usage_metadata=usage(input_tokens, len(content.split())))
+        central_letter, peripheral_letters = fake_puzzle(messages)
+        tool_call = {"id": f"call_{len(messages)}", "name": "spelling_bee_tool",
+                     "args": {"central_letter": central_letter, "peripheral_letters": peripheral_letters}}
+        return AIMessage(content="", tool_calls=[tool_call], usage_metadata=usage(input_tokens, 20))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.latency)
+        for i, chunk in enumerate(reply_chunks(self._reply(messages))):
+            if i:
+                time.sleep(self.token_latency)
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self.latency)
+        for i, chunk in enumerate(reply_chunks(self._reply(messages))):
+            if i:
+                await asyncio.sleep(self.token_latency)
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+def usage(input_tokens: int, output_tokens: int) -> Dict[str, int]:
+    return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+
+
+def fake_puzzle(messages: List[BaseMessage]):
+    # the single letters of the last user message, center letter first, e.g. "center E, letters A G L N O Y"
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            letters = list(dict.fromkeys(re.findall(r"\b([A-Za-z])\b", str(message.content).upper())))
+            if len(letters) == 7:
+                return letters[0], letters[1:]
+            break
+    return FAKE_DEFAULT_PUZZLE
+
+
+def reply_chunks(message: AIMessage) -> List[ChatGenerationChunk]:
+    """
+    Splits a reply into the chunks a streaming API would send: one chunk per word, or a single tool-call chunk,
+    with the usage on the last chunk.
+    """
+    if message.tool_calls:
+        tool_call_chunks = [{"id": t["id"], "name": t["name"], "args": json.dumps(t["args"]), "index": i}
+                            for i, t in enumerate(message.tool_calls)]
+        return [ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=tool_call_chunks, usage_metadata=message.usage_metadata))]
+    words = message.content.split(" ")
+    chunks = [ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else " " + word)) for i, word in enumerate(words)]
+    chunks.append(ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=message.usage_metadata)))
+    return chunks
+
+
+def make_mistral_model() -> BaseChatModel:
+    from langchain_mistralai import ChatMistralAI
+    api_key = os.environ.get("MISTRAL_API_KEY")
+    if not api_key:
+        raise ModelNotConfiguredError("MISTRAL_API_KEY is not set: the Spelling Bee agent cannot reach its model")
+    return ChatMistralAI(
+        model=MISTRAL_MODEL,
+        temperature=0,
+        # keep-alive connections pooled up to the concurrency limit (see utils/agent_runtime.py)
+        **pooled_http_clients(
+            os.environ.get("MISTRAL_BASE_URL", "https://api.mistral.ai/v1"),
+            {"Content-Type": "application/json", "Accept": "application/json", "Authorization": f"Bearer {api_key}"},
+        )
+    )
+
+
+def make_fake_model() -> BaseChatModel:
+    return FakeChatModel(latency=float(os.environ.get("SPELLING_BEE_FAKE_LATENCY", 0.5)),
+                         token_latency=float(os.environ.get("SPELLING_BEE_FAKE_TOKEN_LATENCY", 0.02)))
+
+
+# other backends plug in here: name -> factory returning a LangChain chat model that supports bind_tools
+MODEL_BACKENDS: Dict[str, Callable[[], BaseChatModel]] = {
+    "mistral": make_mistral_model,
+    "fake": make_fake_model,
+}
+
+
+def make_chat_model(backend: Optional[str] = None) -> BaseChatModel:
+    """
+    Returns the chat model of the given backend, by default the one configured by SPELLING_BEE_MODEL. The
+    offline fake model is only used when asked for by name: without an API key, ModelNotConfiguredError is raised.
+    """
+    # .env is read here, when a model is first built, rather than when the agent is imported
+    from dotenv import load_dotenv
+    load_dotenv()
+    if backend is None:
+        backend = os.environ.get("SPELLING_BEE_MODEL")
+    if backend is None:
+        if not os.environ.get("MISTRAL_API_KEY"):
+            raise ModelNotConfiguredError("No chat model is configured for the Spelling Bee agent: set MISTRAL_API_KEY, "
+                                          "or SPELLING_BEE_MODEL=fake for the offline test model")
+        backend = "mistral"
+    if backend not in MODEL_BACKENDS:
+        raise ValueError(f"Unknown model backend: {backend} (available: {', '.join(MODEL_BACKENDS)})")
+    return MODEL_BACKENDS[backend]()
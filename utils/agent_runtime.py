@@ -0,0 +1,184 @@
+import asyncio
+import os
+import queue
+import threading
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Deque, Dict, Iterator, Optional
+
+# Shared runtime of the LLM agents: one background event loop per process that runs every async agent call,
+# a concurrency limiter in front of the model client and pooled HTTP connections.
+# Configuration (environment variables):
+#   LLM_MAX_CONCURRENT_REQUESTS  model requests in flight per process (default 8); others wait their turn
+
+DEFAULT_MAX_CONCURRENT_REQUESTS = 8
+
+
+class ModelNotConfiguredError(RuntimeError):
+    """
+    No chat model backend is configured (see utils/agent_models.py); the message says how to set one.
+    """
+
+
+class _Waiter:
+    """
+    A caller waiting for a slot of the limiter: a sync caller blocks on an event, an async caller awaits a
+    future of its loop. granted is set under the limiter lock when a released slot is handed over.
+    """
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.granted = False
+        self._loop = loop
+        if loop is None:
+            self.event = threading.Event()
+        else:
+            self.future = loop.create_future()
+
+    def wake(self) -> None:
+        if self._loop is None:
+            self.event.set()
+        else:
+            self._loop.call_soon_threadsafe(lambda: self.future.done() or self.future.set_result(None))
+
+
+class ConcurrencyLimiter:
+    """
+    Bounds the number of concurrent model requests, sync and async callers together. Async callers (async with)
+    all run on the background loop and await a future, without waking up until a slot is free; sync callers
+    (with), e.g. a direct invoke from a script, block on an event. Released slots go to the callers in the
+    order they started waiting.
+    """
+    def __init__(self, max_concurrent: int):
+        self.max_concurrent = max_concurrent
+        self._lock = threading.Lock()
+        self._waiters: Deque[_Waiter] = deque()
+        self.in_flight = 0
+        self.waited = 0
+
+    def _try_acquire(self, waiter: _Waiter) -> bool:
+        # under the lock: take a free slot, or queue the waiter
+        if self.in_flight < self.max_concurrent and not self._waiters:
+            self.in_flight += 1
+            return True
+        self.waited += 1
+        self._waiters.append(waiter)
+        return False
+
+    def _release(self) -> None:
+        with self._lock:
+            if not self._waiters:
+                self.in_flight -= 1
+                return
+            # the slot goes straight to the oldest waiter, in_flight is unchanged
+            waiter = self._waiters.popleft()
+            waiter.granted = True
+        waiter.wake()
+
+    def __enter__(self):
+        waiter = _Waiter()
+        with self._lock:
+            acquired = self._try_acquire(waiter)
+        if not acquired:
+            waiter.event.wait()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._release()
+
+    async def __aenter__(self):
+        waiter = _Waiter(asyncio.get_running_loop())
+        with self._lock:
+            acquired = self._try_acquire(waiter)
+        if not acquired:
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                with self._lock:
+                    granted = waiter.granted
+                    if not granted:
+                        self._waiters.remove(waiter)
+                if granted:
+                    # cancelled after a slot was handed over: pass it on
+                    self._release()
+                raise
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._release()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"max_concurrent": self.max_concurrent, "in_flight": self.in_flight, "waited": self.waited}
+
+
+llm_limiter = ConcurrencyLimiter(int(os.environ.get("LLM_MAX_CONCURRENT_REQUESTS", DEFAULT_MAX_CONCURRENT_REQUESTS)))
+
+
+def pooled_http_clients(base_url: str, headers: Dict[str, str], timeout: float = 120) -> Dict[str, Any]:
+    """
+    Returns a sync and an async httpx client that keep up to max_concurrent connections alive, sized
+    to the limiter so that every admitted request reuses a warm connection. The limiter bounds sync and async
+    requests together, so both pools combined never have more than max_concurrent requests in flight. The async client is only used
+    from the background loop (httpx connection pools are bound to the loop that opened them).
+    """
+    import httpx
+    limits = httpx.Limits(max_connections=llm_limiter.max_concurrent, max_keepalive_connections=llm_limiter.max_concurrent)
+    return {
+        "client": httpx.Client(base_url=base_url, headers=headers, timeout=timeout, limits=limits),
+        "async_client": httpx.AsyncClient(base_url=base_url, headers=headers, timeout=timeout, limits=limits),
+    }
+
+
+#region Background event loop
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns the process-wide event loop, started in a daemon thread on first use. Streamlit runs every
+    session in its own script thread; they all submit their agent calls to this loop, so many sessions
+    waiting on the model cost coroutines rather than blocked threads.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="agent-loop", daemon=True).start()
+            _loop = loop
+        return _loop
+
+
+def run(coroutine: Awaitable) -> Any:
+    """
+    Runs a coroutine on the background loop and waits for its result from a sync caller.
+    """
+    return asyncio.run_coroutine_threadsafe(coroutine, get_loop()).result()
+
+
+def iterate(async_iterator: AsyncIterator) -> Iterator:
+    """
+    Iterates an async iterator on the background loop from a sync caller, item by item as they are produced.
+    """
+    items: queue.Queue = queue.Queue()
+    done = object()
+
+    async def pump():
+        try:
+            async for item in async_iterator:
+                items.put((True, item))
+        except BaseException as error:
+            items.put((False, error))
+        finally:
+            items.put((True, done))
+
+    future = asyncio.run_coroutine_threadsafe(pump(), get_loop())
+    try:
+        while True:
+            ok, item = items.get()
+            if not ok:
+                raise item
+            if item is done:
+                return
+            yield item
+    finally:
+        # the consumer stopped early (e.g. the Streamlit script was interrupted): stop producing
+        future.cancel()
+#endregion Background event loop
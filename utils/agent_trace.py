@@ -0,0 +1,155 @@
+import contextvars
+import functools
+import inspect
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Per-request traces of the agent graphs: every node run is a span (node, start offset, duration, token
+# usage and tool calls), collected into the trace of the request being served and aggregated per node.
+
+RECENT_TRACES = 100
+
+
+class Trace:
+    """
+    Spans of the graph nodes run for one request.
+    """
+    def __init__(self):
+        self.request_id = uuid.uuid4().hex[:12]
+        self.started = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add_span(self, span: Dict[str, Any]) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = list(self.spans)
+        node_time = sum(span["duration"] for span in spans)
+        return {
+            "request_id": self.request_id,
+            "duration": self.duration,
+            "spans": spans,
+            "input_tokens": sum(span["input_tokens"] for span in spans),
+            "output_tokens": sum(span["output_tokens"] for span in spans),
+            # time of the request outside the nodes: graph scheduling, streaming and local work
+            "overhead": self.duration - node_time if self.duration is not None else None,
+        }
+
+
+class NodeStats:
+    """
+    Process-wide totals per node, plus the last RECENT_TRACES request traces.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._nodes: Dict[str, Dict[str, float]] = {}
+        self.recent = deque(maxlen=RECENT_TRACES)
+
+    def add_span(self, span: Dict[str, Any]) -> None:
+        with self._lock:
+            stats = self._nodes.setdefault(span["node"], {"calls": 0, "errors": 0, "total_time": 0.0, "max_time": 0.0,
+                                                          "input_tokens": 0, "output_tokens": 0, "tool_calls": 0})
+            stats["calls"] += 1
+            stats["errors"] += span["error"] is not None
+            stats["total_time"] += span["duration"]
+            stats["max_time"] = max(stats["max_time"], span["duration"])
+            stats["input_tokens"] += span["input_tokens"]
+            stats["output_tokens"] += span["output_tokens"]
+            stats["tool_calls"] += span["tool_calls"]
+
+    def add_trace(self, trace: Trace) -> None:
+        with self._lock:
+            self.recent.append(trace)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {node: {**stats, "mean_time": stats["total_time"] / stats["calls"]} for node, stats in self._nodes.items()}
+
+    def recent_traces(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            traces = list(self.recent)
+        return [trace.as_dict() for trace in traces]
+
+
+node_stats = NodeStats()
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("agent_trace", default=None)
+
+
+@contextmanager
+def tracing() -> Iterator[Trace]:
+    """
+    Collects the spans of the nodes run inside the block (including tasks and threads started by the graph,
+    which inherit the context) into a new trace.
+    """
+    trace = Trace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        trace.duration = time.perf_counter() - trace.started
+        node_stats.add_trace(trace)
+        try:
+            _current_trace.reset(token)
+        except ValueError:
+            # an async generator closed from another context
+            pass
+
+
+def record_span(node: str, start: float, result: Any, error: Optional[BaseException]) -> None:
+    duration = time.perf_counter() - start
+    messages = result.get("messages", []) if isinstance(result, dict) else []
+    usages = [getattr(message, "usage_metadata", None) or {} for message in messages]
+    trace = _current_trace.get()
+    span = {
+        "node": node,
+        "start": start - trace.started if trace is not None else None,
+        "duration": duration,
+        "input_tokens": sum(usage.get("input_tokens", 0) for usage in usages),
+        "output_tokens": sum(usage.get("output_tokens", 0) for usage in usages),
+        "tool_calls": sum(len(getattr(message, "tool_calls", None) or []) for message in messages),
+        "error": repr(error) if error is not None else None,
+    }
+    node_stats.add_span(span)
+    if trace is not None:
+        trace.add_span(span)
+
+
+def traced(node: str, func: Callable) -> Callable:
+    """
+    Wraps a sync or async graph node so that each run is recorded as a span.
+    """
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            start, result, error = time.perf_counter(), None, None
+            try:
+                result = await func(*args, **kwargs)
+                return result
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                record_span(node, start, result, error)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start, result, error = time.perf_counter(), None, None
+        try:
+            result = func(*args, **kwargs)
+            return result
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            record_span(node, start, result, error)
+    return wrapper
+
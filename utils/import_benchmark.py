@@ -0,0 +1,107 @@
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+# Cold-start benchmark of the Streamlit app: main_app.py then one page, run in a fresh interpreter (Streamlit bare
+# mode, no browser session), as a new server worker would. The bare `import streamlit` is timed first and reported
+# apart: it is the same for every page and outside the app's control, so the budget applies to what the app adds.
+# Exits with status 1 when a page is over the budget.
+# Usage: python -m utils.import_benchmark --budget 0.5 --repeat 5
+
+DEFAULT_BUDGET = 0.5  # seconds for main_app.py + page on top of import streamlit, interpreter start-up excluded
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_RUN_PAGE = """
+import json, runpy, sys, time
+start = time.perf_counter()
+import streamlit
+streamlit_done = time.perf_counter()
+runpy.run_path("main_app.py", run_name="__main__")
+main_done = time.perf_counter()
+runpy.run_path(sys.argv[1], run_name="__main__")
+print(json.dumps({"streamlit": streamlit_done - start, "main_app": main_done - streamlit_done, "page": time.perf_counter() - main_done}))
+"""
+
+
+def run_fresh(page: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, "PYTHONPATH": ROOT}
+    return subprocess.run([sys.executable, "-c", _RUN_PAGE, page], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+
+
+def cold_start(page: str, repeat: int) -> Dict[str, float]:
+    """
+    Returns the median time of import streamlit, of main_app.py, of the page and of the last two, over repeat
+    fresh interpreters. A first run is not counted: it builds the on-disk word-list caches, which new workers find ready.
+    """
+    run_fresh(page)
+    runs = [json.loads(run_fresh(page).stdout.strip().splitlines()[-1]) for _ in range(repeat)]
+    return {
+        "streamlit": statistics.median(run["streamlit"] for run in runs),
+        "main_app": statistics.median(run["main_app"] for run in runs),
+        "page": statistics.median(run["page"] for run in runs),
+        "total": statistics.median(run["main_app"] + run["page"] for run in runs),
+    }
+
+
+def import_times(args: List[str]) -> Dict[str, int]:
+    """
+    Returns the cumulative import time in microseconds of every module imported by the given interpreter
+    arguments (python -X importtime).
+    """
+    env = {**os.environ, "PYTHONPATH": ROOT}
+    stderr = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT, env=env, capture_output=True, text=True, check=True).stderr
+    times = {}
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, module = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                times[module.strip()] = int(cumulative)
+    return times
+
+
+def slowest_imports(page: str, k: int = 10) -> List[str]:
+    """
+    Returns the k imports with the highest cumulative time when starting the page, leaving out the modules
+    that import streamlit loads by itself.
+    """
+    baseline = import_times(["-c", "import streamlit"])
+    rows = [(cumulative, module) for module, cumulative in import_times(["-c", _RUN_PAGE, page]).items() if module not in baseline]
+    return [f"{module}: {cumulative / 1000:.0f} ms" for cumulative, module in sorted(rows, reverse=True)[:k]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the cold-start time of main_app.py plus each page, on top of import streamlit, against a budget.")
+    parser.add_argument("--pages", nargs="+", default=None, help="page scripts (default: pages/*.py)")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="seconds allowed for main_app.py + page, import streamlit excluded")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per page, the median is kept")
+    parser.add_argument("--output", default=None, help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    pages = args.pages or sorted(os.path.relpath(path, ROOT) for path in glob.glob(os.path.join(ROOT, "pages", "*.py")))
+    results = {"budget_s": args.budget, "python": sys.version.split()[0], "pages": {}}
+    over_budget = []
+    for page in pages:
+        times = cold_start(page, args.repeat)
+        results["pages"][page] = times
+        status = "ok" if times["total"] <= args.budget else "OVER BUDGET"
+        print(f"{page}: main_app {times['main_app'] * 1000:.0f} ms + page {times['page'] * 1000:.0f} ms = {times['total'] * 1000:.0f} ms "
+              f"(+ import streamlit {times['streamlit'] * 1000:.0f} ms) [{status}]")
+        if times["total"] > args.budget:
+            over_budget.append(page)
+            for line in slowest_imports(page):
+                print(f"    {line}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if over_budget:
+        print(f"{len(over_budget)} page(s) over the {args.budget:.2f} s budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
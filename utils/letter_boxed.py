@@ -0,0 +1,544 @@
+import heapq
+import multiprocessing
+import os
+import struct
+import threading
+import uuid
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, wraps
+from itertools import islice
+from datetime import datetime
+from utils.word_store import load_word_store, open_or_build, pack_derived, unpack_derived
+
+
+def timed(func):
+    @wraps(func)
+    def timed_func(*args, **kwargs):
+        start_time = datetime.now()
+        ret = func(*args, **kwargs)
+        print(f'{func.__name__} - {(datetime.now() - start_time).total_seconds():.4f}')
+        return ret
+    return timed_func
+
+#region Compact trie
+# Binary layout (little endian), after the derived-file header (see utils/word_store.py), keyed on the word store:
+#   node_count:  uint32
+#   first_child: uint32[node_count]  index of the first child (children are contiguous, BFS order)
+#   labels:      uint8[node_count]   character leading to the node (0 for the root)
+#   child_count: uint8[node_count]
+#   terminal:    uint8[node_count]   1 if the path to the node spells a word
+TRIE_MAGIC = b"LBOXTRIE"
+TRIE_VERSION = 1
+TRIE_COUNTS = struct.Struct("<I")
+
+
+class CompactTrie:
+    """
+    Read-only, array-backed trie. Node 0 is the root and the children of every node are stored
+    contiguously, so a node is fully described by four integers and no per-node Python object exists.
+    """
+    def __init__(self, buffer, verify: bool = True):
+        self._buffer = buffer
+        self.checksum, self.source_checksum, view = unpack_derived(buffer, TRIE_MAGIC, TRIE_VERSION, "Letter Boxed trie", verify)
+        self.node_count, = TRIE_COUNTS.unpack_from(view)
+        n = self.node_count
+        offset = TRIE_COUNTS.size
+        self.first_child = view[offset:offset + 4 * n].cast("I")
+        offset += 4 * n
+        self.labels = view[offset:offset + n]
+        self.child_count = view[offset + n:offset + 2 * n]
+        self.terminal = view[offset + 2 * n:offset + 3 * n]
+
+    def children(self, node: int) -> range:
+        first = self.first_child[node]
+        return range(first, first + self.child_count[node])
+
+    def is_stale(self, dictionary: str) -> bool:
+        return self.source_checksum != load_word_store(dictionary).checksum
+
+
+def build_trie_bytes(dictionary: str) -> bytes:
+    # build a temporary dict-of-dicts trie from the shared word store (see utils/word_store.py),
+    # then number the nodes breadth first
+    store = load_word_store(dictionary)
+    root = {}
+    terminal_key = ""  # never a valid child label
+    for word in store.words():
+        node = root
+        for char in word.lower():
+            node = node.setdefault(char, {})
+        node[terminal_key] = True
+
+    labels = bytearray([0])
+    terminal = bytearray([1 if terminal_key in root else 0])
+    child_count = bytearray()
+    first_child = []
+    queue = [root]
+    for node in queue:  # the queue grows while iterating
+        first_child.append(len(queue))
+        chars = sorted(char for char in node if char != terminal_key)
+        child_count.append(len(chars))
+        for char in chars:
+            child = node[char]
+            queue.append(child)
+            labels.append(ord(char))
+            terminal.append(1 if terminal_key in child else 0)
+
+    n = len(queue)
+    payload = TRIE_COUNTS.pack(n) + struct.pack(f"<{n}I", *first_child) + bytes(labels) + bytes(child_count) + bytes(terminal)
+    return pack_derived(TRIE_MAGIC, TRIE_VERSION, store.checksum, payload)
+
+
+def trie_path(dictionary: str) -> str:
+    return os.path.splitext(dictionary)[0] + ".trie"
+
+
+_tries: Dict[str, CompactTrie] = {}
+_tries_lock = threading.Lock()
+
+def load_trie(dictionary: str) -> CompactTrie:
+    """
+    Returns the compact trie for the given word list. The trie is serialized next to the word list
+    (rebuilt only when the word store changes) and memory-mapped, so every session in the process shares one
+    copy and every worker process shares the same pages of the OS file cache.
+    """
+    def loader(buffer, verify: bool) -> CompactTrie:
+        trie = CompactTrie(buffer, verify)
+        if trie.is_stale(dictionary):
+            raise ValueError("Letter Boxed trie of another word store")
+        return trie
+
+    key = os.path.abspath(dictionary)
+    with _tries_lock:
+        trie = _tries.get(key)
+        if trie is None or trie.is_stale(dictionary):
+            trie = open_or_build(trie_path(dictionary), lambda: build_trie_bytes(dictionary), loader)
+            _tries[key] = trie
+        return trie
+#endregion Compact trie
+
+
+class Edge(NamedTuple):
+    first: int
+    last: int
+    mask: int
+    words: List[str]
+
+
+class LetterBoxed:
+    @timed
+    def __init__(self, input_string: str, dictionary: str, len_threshold=3):
+        # parse the input string (abc-def-ghi-jkl) into set of 4 sides
+        self.input_string = input_string.lower()
+        self.sides = {side for side in input_string.split('-')}
+        self.puzzle_letters = {letter for side in self.sides for letter in side}
+        self.len_threshold = len_threshold
+        self.dictionary = dictionary
+
+        # letter_sides[letter] = sides the letter sits on (a single side for well-formed puzzles)
+        self.letter_sides = defaultdict(set)
+        for side in self.sides:
+            for letter in side:
+                self.letter_sides[letter].add(side)
+
+        # shared, memory-mapped trie built from newline-delimited .txt word list
+        self.trie = load_trie(dictionary)
+
+        # find all valid words in puzzle
+        self.puzzle_words = self.get_puzzle_words()
+
+        # puzzle_graph[starting_letter][ending_letter] = {{letters}: [words]}
+        # e.g. puzzle_graph['f']['s'] = {{'a','e','f','r','s'} : ['fares', 'fears', 'farers', 'fearers']}
+        self.puzzle_graph = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
+        for word in self.puzzle_words:
+            self.puzzle_graph[word[0]][word[-1]][frozenset(word)].append(word)
+
+        # bitmask view of puzzle_graph used by the solver
+        self._build_edges()
+
+        # _searches[cursor id] = ((depth, offset), live ranked generator) of the cursors handed out, least recent first
+        self._searches: "OrderedDict[str, Tuple[Tuple[int, int], Iterator[Tuple[int, ...]]]]" = OrderedDict()
+        self._searches_lock = threading.Lock()
+
+    def _puzzle_words_inner(self, node: int, last_side: str, prefix: str) -> List[str]:
+        trie = self.trie
+        valid_words = [prefix] if trie.terminal[node] else []
+        for child in trie.children(node):
+            next_letter = chr(trie.labels[child])
+            for next_side in self.letter_sides.get(next_letter, ()):
+                if next_side != last_side:
+                    valid_words += self._puzzle_words_inner(child, next_side, prefix + next_letter)
+        return valid_words
+
+    @timed
+    def get_puzzle_words(self) -> List[str]:
+        all_valid_words = []
+        for child in self.trie.children(0):
+            starting_letter = chr(self.trie.labels[child])
+            for starting_side in sorted(self.letter_sides.get(starting_letter, ())):
+                all_valid_words += self._puzzle_words_inner(child, starting_side, starting_letter)
+        return all_valid_words
+
+    def _build_edges(self) -> None:
+        # letters are indexed in sorted order so that masks and edge ids do not depend on set ordering
+        self.letters = sorted(self.puzzle_letters)
+        self.letter_index = {letter: i for i, letter in enumerate(self.letters)}
+        # edges[i] = (first letter index, last letter index, 12-bit letter mask, words); edges_from[letter index] = [edge ids]
+        self.edges: List[Edge] = []
+        self.edges_from: List[List[int]] = [[] for _ in self.letters]
+        for first_letter in self.letters:
+            for last_letter in self.letters:
+                for letter_edge, edge_words in self.puzzle_graph.get(first_letter, {}).get(last_letter, {}).items():
+                    mask = 0
+                    for letter in letter_edge:
+                        mask |= 1 << self.letter_index[letter]
+                    self.edges_from[self.letter_index[first_letter]].append(len(self.edges))
+                    self.edges.append(Edge(self.letter_index[first_letter], self.letter_index[last_letter], mask, edge_words))
+        # _counts[remaining][mask][kind][last] = meta-solutions (kind 0) and full combinations (kind 1) of the
+        # continuations of a state, built on first use by _build_count_tables
+        self._counts: Optional[List[Optional[List[List[List[int]]]]]] = None
+
+    def _build_count_tables(self) -> None:
+        """
+        Bottom-up DP over a [remaining][mask][last] table. Edges are grouped by (first letter, letter mask), and one
+        step sums, for every state, the tables of the states reached by each group. With g the previous table and
+        w the number of edges (or words) of each group, sum_a w(a) * g(mask | a) is computed for all masks at once
+        as the superset sum of (Moebius inverse of g) * (subset sum of w), minus the groups adding no new letter.
+        """
+        # imported here so that opening the Letter Boxed page does not load numpy
+        import numpy as np
+        n_letters = len(self.letters)
+        n_masks = 1 << n_letters
+
+        def transform(table, superset, inverse=False):
+            # in-place sum over the supersets (or subsets) of every mask along axis 0, or its inverse
+            ufunc = np.subtract if inverse else np.add
+            for bit in range(n_letters):
+                view = table.reshape(n_masks >> (bit + 1), 2, 1 << bit, *table.shape[1:])
+                target, source = (view[:, 0], view[:, 1]) if superset else (view[:, 1], view[:, 0])
+                ufunc(target, source, out=target)
+            return table
+
+        # weights[mask, kind, last, first] = edges (kind 0) or words (kind 1) of the group, per last letter
+        edge_words = [len(edge.words) for edge in self.edges]
+        # int64 arithmetic wraps around but stays exact modulo 2 ** 64, so it is right whenever every count fits;
+        # a count with r words to go is at most the largest number of words leaving a letter to the power r
+        out_words = max([sum(n for edge, n in zip(self.edges, edge_words) if edge.first == first) for first in range(n_letters)], default=0)
+        dtype = np.int64 if out_words ** self.len_threshold < 2 ** 62 else object
+        weights = np.zeros((n_masks, 2, n_letters, n_letters), dtype=dtype)
+        for edge, n_words in zip(self.edges, edge_words):
+            weights[edge.mask, 0, edge.last, edge.first] += 1
+            weights[edge.mask, 1, edge.last, edge.first] += n_words
+        subset_weights = transform(weights, superset=False)
+
+        # table[mask, kind, last] with 0 words to go: 1 for the state covering all 12 letters, 0 otherwise
+        table = np.zeros((n_masks, 2, n_letters), dtype=dtype)
+        full_mask = n_masks - 1 if n_letters == 12 else None
+        if full_mask is not None:
+            table[full_mask] = 1
+        counts = [None]
+        with np.errstate(over="ignore"):
+            for _ in range(1, self.len_threshold):
+                inverse = transform(table.copy(), superset=True, inverse=True)
+                step = transform(np.einsum("mkl,mklf->mkf", inverse, subset_weights), superset=True)
+                # groups whose letters are all covered already do not extend the path
+                step -= np.einsum("mkl,mklf->mkf", table, subset_weights)
+                if full_mask is not None:
+                    step[full_mask] = 1
+                table = step
+                counts.append(table.tolist())
+        self._counts = counts
+
+    def _count(self, mask: int, last: int, remaining: int) -> Tuple[int, int]:
+        if mask.bit_count() == 12:
+            return 1, 1
+        elif remaining <= 0:
+            return 0, 0
+        if self._counts is None:
+            self._build_count_tables()
+        meta, full = self._counts[remaining][mask]
+        return meta[last], full[last]
+
+    def count_solutions(self) -> Tuple[int, int]:
+        """
+        Returns the number of meta-solutions (distinct paths of word groups) and the number of full
+        solutions (unique combinations of words) without listing any path.
+        """
+        meta_count = full_count = 0
+        for edge in self.edges:
+            meta, full = self._count(edge.mask, edge.last, self.len_threshold - 1)
+            meta_count += meta
+            full_count += full * len(edge.words)
+        return meta_count, full_count
+
+    def _generate_paths_inner(self, path: Tuple[int, ...], mask: int, last: int, remaining: int) -> Iterator[Tuple[int, ...]]:
+        if mask.bit_count() == 12:
+            yield path
+            return
+        for edge_id in self.edges_from[last]:
+            edge = self.edges[edge_id]
+            # only descend into subproblems that the memo knows to contain solutions
+            if edge.mask & ~mask and self._count(mask | edge.mask, edge.last, remaining - 1)[0]:
+                yield from self._generate_paths_inner(path + (edge_id,), mask | edge.mask, edge.last, remaining - 1)
+
+    def _generate_first_edge_paths(self, edge_ids: List[int]) -> Iterator[Tuple[int, ...]]:
+        for edge_id in edge_ids:
+            edge = self.edges[edge_id]
+            if self._count(edge.mask, edge.last, self.len_threshold - 1)[0]:
+                yield from self._generate_paths_inner((edge_id,), edge.mask, edge.last, self.len_threshold - 1)
+
+    def _partition_first_edges(self, n_chunks: int) -> List[List[int]]:
+        # split the first-edge frontier into contiguous runs holding roughly the same number of solutions,
+        # so that concatenating the chunk results in order reproduces the serial ordering
+        weights = [self._count(edge.mask, edge.last, self.len_threshold - 1)[0] for edge in self.edges]
+        target = max(1, -(-sum(weights) // n_chunks))
+        chunks, chunk, chunk_weight = [], [], 0
+        for edge_id, weight in enumerate(weights):
+            if weight == 0:
+                continue
+            chunk.append(edge_id)
+            chunk_weight += weight
+            if chunk_weight >= target:
+                chunks.append(chunk)
+                chunk, chunk_weight = [], 0
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def generate_paths(self, workers: Optional[int] = 1) -> Iterator[Tuple[int, ...]]:
+        """
+        Yields every meta-solution as a tuple of edge ids (indices into self.edges), in depth-first order.
+        With workers > 1 (None for one per CPU) the first-edge subtrees are solved in a process pool;
+        the output is identical to the serial one.
+        """
+        workers = min(workers or os.cpu_count() or 1, os.cpu_count() or 1)
+        if workers <= 1:
+            yield from self._generate_first_edge_paths(range(len(self.edges)))
+            return
+
+        chunks = self._partition_first_edges(workers * CHUNKS_PER_WORKER)
+        # spawn (rather than fork) so that worker processes never inherit the threads of the Streamlit server
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(chunks)) or 1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.input_string, self.dictionary, self.len_threshold)
+        ) as executor:
+            for paths in executor.map(_solve_first_edges, chunks):
+                yield from paths
+
+    def _completes_in(self, mask: int, last: int, n_words: int) -> bool:
+        # True if the state can be completed with exactly n_words more words
+        if mask.bit_count() == 12:
+            return n_words == 0
+        return n_words > 0 and self._count(mask, last, n_words)[0] > self._count(mask, last, n_words - 1)[0]
+
+    def generate_ranked_paths(self, word_frequency: Optional[Dict[str, float]] = None, start_depth: int = 1) -> Iterator[Tuple[int, ...]]:
+        """
+        Yields meta-solutions best first: by number of words, then by total letters (shortest word of each
+        group), then by word frequency when a word -> frequency mapping is given. Each depth is searched
+        best first and only partial paths that can still be completed with exactly that many words are
+        kept on the heap. A popped path only pushes its best child and its next sibling (edges are pre-sorted
+        by rank), so the heap grows by at most two entries per step instead of by every child. The generator
+        is resumable: keep it to get the next solution without restarting the search.
+        """
+        edge_letters = [min(len(word) for word in edge.words) for edge in self.edges]
+        if word_frequency:
+            edge_costs = [-max(word_frequency.get(word, 0.0) for word in edge.words) for edge in self.edges]
+        else:
+            edge_costs = [0.0] * len(self.edges)
+        rank = lambda edge_id: (edge_letters[edge_id], edge_costs[edge_id], edge_id)
+        ranked_from = [sorted(edge_ids, key=rank) for edge_ids in self.edges_from]
+        # children[(mask, last letter, words to go)] = edges extending the state, best first, that add a letter
+        # and can still be completed with the remaining words; shared by every path reaching the state
+        children: Dict[Tuple[int, int, int], List[int]] = {}
+
+        def state_children(mask: int, last: Optional[int], remaining: int) -> List[int]:
+            key = (mask, last, remaining)
+            edge_ids = children.get(key)
+            if edge_ids is None:
+                candidates = sorted(range(len(self.edges)), key=rank) if last is None else ranked_from[last]
+                edge_ids = children[key] = [
+                    edge_id for edge_id in candidates
+                    if (mask | self.edges[edge_id].mask) != mask and self._completes_in(mask | self.edges[edge_id].mask, self.edges[edge_id].last, remaining)
+                ]
+            return edge_ids
+
+        for depth in range(start_depth, self.len_threshold + 1):
+            # heap items: (total letters, cost, path, covered mask, last letter, sibling edge ids, index in siblings,
+            #              parent as (total letters, cost, path, covered mask))
+            heap = []
+
+            def push(siblings: List[int], i: int, parent: Tuple[int, float, Tuple[int, ...], int]) -> None:
+                if i < len(siblings):
+                    letters, cost, path, mask = parent
+                    edge_id = siblings[i]
+                    edge = self.edges[edge_id]
+                    heapq.heappush(heap, (letters + edge_letters[edge_id], cost + edge_costs[edge_id], path + (edge_id,),
+                                          mask | edge.mask, edge.last, siblings, i, parent))
+
+            push(state_children(0, None, depth - 1), 0, (0, 0.0, (), 0))
+            while heap:
+                letters, cost, path, mask, last, siblings, i, parent = heapq.heappop(heap)
+                push(siblings, i + 1, parent)
+                if len(path) == depth:
+                    yield path
+                else:
+                    push(state_children(mask, last, depth - len(path) - 1), 0, (letters, cost, path, mask))
+
+    def generate_ranked_solutions(self, word_frequency: Optional[Dict[str, float]] = None) -> Iterator[List[List[str]]]:
+        for path in self.generate_ranked_paths(word_frequency):
+            yield self.path_words(path)
+
+    def top_solutions(self, k: int, word_frequency: Optional[Dict[str, float]] = None) -> List[List[List[str]]]:
+        # the ranked generator is lazy, so the search stops as soon as k solutions are known
+        return list(islice(self.generate_ranked_solutions(word_frequency), k))
+
+    def cursor(self) -> Dict:
+        """
+        Returns a cursor at the start of the ranked solution stream. Cursors are small JSON-serializable
+        dicts, so a session can keep its position without holding on to the puzzle or a generator.
+        """
+        return {"version": CURSOR_VERSION, "puzzle": self.input_string, "len_threshold": self.len_threshold,
+                "id": uuid.uuid4().hex, "depth": 1, "offset": 0}
+
+    def next_solutions(self, cursor: Dict, n: int = 1) -> Tuple[List[List[List[str]]], Dict]:
+        """
+        Returns the next n ranked solutions after the cursor position, and the cursor following them.
+        The live search of each cursor is kept on the puzzle, so paging costs the same at any position;
+        the search is only replayed up to the cursor when it was evicted.
+        """
+        if cursor.get("version") != CURSOR_VERSION or cursor["puzzle"] != self.input_string or cursor["len_threshold"] != self.len_threshold:
+            raise ValueError("Cursor does not belong to this puzzle")
+        depth, offset = cursor["depth"], cursor["offset"]
+        with self._searches_lock:
+            position, paths = self._searches.pop(cursor["id"], (None, None))
+        if position != (depth, offset):
+            paths = self.generate_ranked_paths(start_depth=depth)
+            for _ in islice(paths, offset):
+                pass
+        solutions = []
+        for path in islice(paths, n):
+            if len(path) == depth:
+                offset += 1
+            else:
+                depth, offset = len(path), 1
+            solutions.append(self.path_words(path))
+        with self._searches_lock:
+            self._searches[cursor["id"]] = ((depth, offset), paths)
+            while len(self._searches) > LIVE_CURSORS:
+                self._searches.popitem(last=False)
+        return solutions, dict(cursor, depth=depth, offset=offset)
+
+    def _extend_chains(self, chains: List[Tuple[Tuple[int, ...], int, int]]) -> List[Tuple[Tuple[int, ...], int, int]]:
+        # chains are (edge ids, covered mask, last letter); every added edge must bring a new letter
+        extended = []
+        for path, mask, last in chains:
+            for edge_id in self.edges_from[last]:
+                edge = self.edges[edge_id]
+                if edge.mask & ~mask:
+                    extended.append((path + (edge_id,), mask | edge.mask, edge.last))
+        return extended
+
+    def _join_is_valid(self, mask: int, suffix: Tuple[int, ...]) -> bool:
+        # replay the suffix after the prefix: each word adds a letter and all letters are covered only at the end
+        for i, edge_id in enumerate(suffix):
+            edge_mask = self.edges[edge_id].mask
+            if not edge_mask & ~mask:
+                return False
+            mask |= edge_mask
+            if mask.bit_count() == 12 and i < len(suffix) - 1:
+                return False
+        return True
+
+    def find_all_paths_meet_in_middle(self) -> List[Tuple[int, ...]]:
+        """
+        Same paths as generate_paths, computed by joining half-chains instead of extending every prefix.
+        For k words, prefixes of (k + 1) // 2 words are joined with suffixes of k // 2 words that start at the
+        prefix's last letter. Suffixes are indexed by (junction letter, covered mask), and a prefix covering
+        `mask` only probes the masks containing its complement, i.e. complement | submask for each submask.
+        """
+        if len(self.letters) != 12:
+            return list(self.generate_paths())
+        full_mask = (1 << 12) - 1
+
+        # chains[n] = valid chains of n words, built once and shared by prefixes and suffixes
+        chains = {1: [((edge_id,), edge.mask, edge.last) for edge_id, edge in enumerate(self.edges)]}
+        for n in range(2, (self.len_threshold + 1) // 2 + 1):
+            chains[n] = self._extend_chains([chain for chain in chains[n - 1] if chain[1] != full_mask])
+
+        paths = [path for path, mask, _ in chains[1] if mask == full_mask]
+        for n_words in range(2, self.len_threshold + 1):
+            # prefixes sharing (last letter, mask) accept exactly the same suffixes, so join them as a group
+            prefix_groups = defaultdict(list)
+            for path, mask, last in chains[(n_words + 1) // 2]:
+                if mask != full_mask:
+                    prefix_groups[(last, mask)].append(path)
+            suffix_index = defaultdict(list)
+            for path, mask, _ in chains[n_words // 2]:
+                suffix_index[(self.edges[path[0]].first, mask)].append(path)
+
+            for (last, mask), prefixes in prefix_groups.items():
+                complement = full_mask & ~mask
+                submask = mask
+                while True:
+                    for suffix in suffix_index.get((last, complement | submask), ()):
+                        if self._join_is_valid(mask, suffix):
+                            paths.extend(prefix + suffix for prefix in prefixes)
+                    if submask == 0:
+                        break
+                    submask = (submask - 1) & mask
+
+        # edge ids follow the depth-first order and no solution is a prefix of another,
+        # so sorting the paths reproduces the order of find_all_solutions
+        paths.sort()
+        return paths
+
+    @timed
+    def find_all_solutions_meet_in_middle(self) -> List[List[List[str]]]:
+        return [self.path_words(path) for path in self.find_all_paths_meet_in_middle()]
+
+    def path_words(self, path: Tuple[int, ...]) -> List[List[str]]:
+        return [self.edges[edge_id].words for edge_id in path]
+
+    @timed
+    def find_all_solutions(self, workers: Optional[int] = 1) -> List[List[List[str]]]:
+        return [self.path_words(path) for path in self.generate_paths(workers)]
+
+    def generate_solutions(self, workers: Optional[int] = 1) -> Iterator[List[List[str]]]:
+        for path in self.generate_paths(workers):
+            yield self.path_words(path)
+
+
+#region Shared puzzles
+CURSOR_VERSION = 2
+LIVE_CURSORS = 64  # live ranked searches kept per puzzle
+
+@lru_cache(maxsize=32)
+def get_puzzle(input_string: str, dictionary: str, len_threshold: int = 3) -> LetterBoxed:
+    """
+    Process-wide cache of solved puzzles, so that sessions paging through the same puzzle with a cursor
+    share one LetterBoxed (and its memo) instead of each keeping their own.
+    """
+    return LetterBoxed(input_string, dictionary, len_threshold=len_threshold)
+
+def puzzle_from_cursor(cursor: Dict, dictionary: str) -> LetterBoxed:
+    return get_puzzle(cursor["puzzle"], dictionary, cursor["len_threshold"])
+#endregion Shared puzzles
+
+
+#region Process pool workers
+CHUNKS_PER_WORKER = 4
+
+_worker_puzzle: Optional[LetterBoxed] = None
+
+def _init_worker(input_string: str, dictionary: str, len_threshold: int) -> None:
+    # every worker rebuilds the puzzle from the shared memory-mapped trie, which yields identical edge ids
+    global _worker_puzzle
+    _worker_puzzle = LetterBoxed(input_string, dictionary, len_threshold=len_threshold)
+
+def _solve_first_edges(edge_ids: List[int]) -> List[Tuple[int, ...]]:
+    return list(_worker_puzzle._generate_first_edge_paths(edge_ids))
+#endregion Process pool workers
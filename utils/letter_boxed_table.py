@@ -0,0 +1,99 @@
+import io
+import math
+from typing import Iterator, List, Optional, Tuple
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from utils.letter_boxed import LetterBoxed
+
+# One row per meta-solution: its position in the solver ordering, the edge ids of its word groups
+# (indices into LetterBoxed.edges), its number of word groups and its number of word combinations
+SOLUTIONS_SCHEMA = pa.schema([
+    ("index", pa.int64()),
+    ("edge_ids", pa.list_(pa.int32())),
+    ("words", pa.int8()),
+    ("combinations", pa.int64()),
+])
+
+SORT_COLUMNS = {
+    "Solver order": "index",
+    "Combinations": "combinations",
+    "Path length": "words",
+}
+
+
+def _batch(puzzle: LetterBoxed, paths: List[Tuple[int, ...]], start: int) -> pa.RecordBatch:
+    return pa.RecordBatch.from_arrays([
+        pa.array(range(start + 1, start + len(paths) + 1), pa.int64()),
+        pa.array(paths, pa.list_(pa.int32())),
+        pa.array([len(path) for path in paths], pa.int8()),
+        pa.array([math.prod(len(puzzle.edges[edge_id].words) for edge_id in path) for path in paths], pa.int64()),
+    ], schema=SOLUTIONS_SCHEMA)
+
+
+def generate_solution_batches(puzzle: LetterBoxed, batch_size: int = 50_000, workers: Optional[int] = 1) -> Iterator[pa.RecordBatch]:
+    """
+    Streams the solver output as Arrow record batches, so only one batch of Python tuples is alive at a time.
+    The depth-first solver is used rather than the meet-in-the-middle join, which needs every path in memory
+    before it can sort them.
+    """
+    solver_paths = puzzle.generate_paths(workers)
+    paths, start = [], 0
+    for path in solver_paths:
+        paths.append(path)
+        if len(paths) == batch_size:
+            yield _batch(puzzle, paths, start)
+            start += len(paths)
+            paths = []
+    if paths or start == 0:
+        yield _batch(puzzle, paths, start)
+
+
+def solutions_table(puzzle: LetterBoxed, batch_size: int = 50_000, workers: Optional[int] = 1) -> pa.Table:
+    return pa.Table.from_batches(list(generate_solution_batches(puzzle, batch_size, workers)), schema=SOLUTIONS_SCHEMA)
+
+
+def sorted_page(table: pa.Table, sort_by: str = "index", descending: bool = False, page: int = 0, page_size: int = 100) -> pa.Table:
+    """
+    Returns one page of the table in the requested order. Only the row indices are sorted, and only
+    the rows of the page are taken from the table.
+    """
+    if sort_by == "index" and not descending:
+        return table.slice(page * page_size, page_size)
+    # the solver index breaks ties so that pages are stable
+    indices = pc.sort_indices(table, sort_keys=[(sort_by, "descending" if descending else "ascending"), ("index", "ascending")])
+    return table.take(indices.slice(page * page_size, page_size))
+
+
+def format_paths(puzzle: LetterBoxed, edge_id_lists: List[List[int]]) -> List[str]:
+    return [" → ".join("/".join(puzzle.edges[edge_id].words) for edge_id in edge_ids) for edge_ids in edge_id_lists]
+
+
+def _export_batch(puzzle: LetterBoxed, batch: pa.RecordBatch) -> pa.RecordBatch:
+    return pa.RecordBatch.from_arrays([
+        batch.column("index"),
+        pa.array(format_paths(puzzle, batch.column("edge_ids").to_pylist()), pa.string()),
+        batch.column("words"),
+        batch.column("combinations"),
+    ], names=["#", "Meta-Solution Path", "Words", "Combinations"])
+
+
+def export_solutions(puzzle: LetterBoxed, table: pa.Table, file_format: str = "parquet", batch_size: int = 50_000) -> bytes:
+    """
+    Serializes the solutions table as Parquet or CSV, with the word groups of each path spelled out.
+    """
+    # paths are formatted one batch at a time, never for the whole table at once
+    batches = table.to_batches(max_chunksize=batch_size) or [pa.RecordBatch.from_pylist([], schema=SOLUTIONS_SCHEMA)]
+    schema = _export_batch(puzzle, batches[0].slice(0, 0)).schema
+    sink = io.BytesIO()
+    if file_format == "parquet":
+        writer = pq.ParquetWriter(sink, schema)
+    elif file_format == "csv":
+        writer = pa_csv.CSVWriter(sink, schema)
+    else:
+        raise ValueError(f"Unknown export format: {file_format}")
+    with writer:
+        for batch in batches:
+            writer.write_batch(_export_batch(puzzle, batch))
+    return sink.getvalue()
@@ -1,5 +1,10 @@
-from typing import List, Tuple
-from langchain_core.tools import tool
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from utils.spelling_bee_cache import get_cache, puzzle_key
+from utils.spelling_bee_index import WORDS_PATH, load_spelling_bee_index
+from utils.spelling_bee_table import load_answer_table
 
 def is_valid(word: str, central_letter: str, peripheral_letters: List[str]) -> bool:
     central_letter = central_letter.upper()
@@ -12,36 +17,157 @@ def is_valid(word: str, central_letter: str, peripheral_letters: List[str]) -> b
     return True
     
 
-def spelling_bee(central_letter: str, peripheral_letters: List[str]) -> List[Tuple[int, List[str]]]:
-    with open("pages/words_for_spelling_bee.txt") as f:
-        words = [word.rstrip().upper() for word in f if word.rstrip().isalpha() and len(word.rstrip()) > 3]
-    valid_words = [word for word in words if is_valid(word, central_letter, peripheral_letters)]
-    valid_words_categorised_by_length = {}
-    for word in valid_words:
-        length = len(word)
-        if length not in valid_words_categorised_by_length:
-            valid_words_categorised_by_length[length] = []
-        valid_words_categorised_by_length[length].append(word)
-    valid_words_ordered_by_length = [(number, valid_words_categorised_by_length[number]) for number in sorted(list(valid_words_categorised_by_length.keys()), reverse=True)]
-    return valid_words_ordered_by_length
-
-@tool
-def spelling_bee_tool(central_letter: str, peripheral_letters: List[str]) -> List[Tuple[int, List[str]]]:
+def spelling_bee(central_letter: str, peripheral_letters: List[str], words_path: str = WORDS_PATH) -> List[Tuple[int, List[str]]]:
+    # a real puzzle is a single lookup in the precomputed answer table (see utils/spelling_bee_table.py);
+    # anything else takes 64 lookups in the shared letter-mask index (see utils/spelling_bee_index.py)
+    table = load_answer_table(words_path)
+    if table is not None:
+        i = table.find(central_letter, peripheral_letters)
+        if i is not None:
+            return table.solve(i)
+    return load_spelling_bee_index(words_path).solve(central_letter, peripheral_letters)
+
+#region Local fast path
+# Well-formed puzzles are parsed and answered without the LLM. Accepted formats: the center letter first,
+# then the six peripheral letters, e.g. "A, [B, C, D, E, F, G]", "[A, [B, C, D, E, F, G]]", "E, A G L N O Y",
+# "E: ALGNOY" or "E [ALGNOY]" (case insensitive). Anything else is left to the agent.
+PUZZLE_PATTERN = re.compile(r"^[\s\[\](){}'\",:;/|-]*[A-Za-z](?:[\s\[\](){}'\",:;/|-]+[A-Za-z]+)+[\s\[\](){}'\",:;/|-]*$")
+# the compact form (peripheral letters as one group) reads like English ("I forget"), so it needs one of these
+COMPACT_DELIMITER = re.compile(r"[:\[\](){}]")
+
+
+def parse_puzzle(message: str) -> Optional[Tuple[str, List[str]]]:
+    """
+    Returns (central letter, peripheral letters) for a structured puzzle message, or None when the message
+    is free-form or ambiguous (the puzzle needs 7 distinct letters, and a compact group needs a delimiter).
+    """
+    message = message.strip()
+    if not PUZZLE_PATTERN.match(message):
+        return None
+    central_letter, *groups = re.findall(r"[A-Za-z]+", message.upper())
+    if len(groups) == 1 and COMPACT_DELIMITER.search(message):
+        peripheral_letters = list(groups[0])
+    elif all(len(group) == 1 for group in groups):
+        peripheral_letters = groups
+    else:
+        return None
+    if len(peripheral_letters) != 6 or len(set(peripheral_letters + [central_letter])) != 7:
+        return None
+    return central_letter, peripheral_letters
+
+
+def format_solution(central_letter: str, peripheral_letters: List[str], valid_words: List[Tuple[int, List[str]]]) -> str:
+    """
+    Formats the words found by spelling_bee as a chat answer, grouped by length with the pangrams marked.
+    """
+    puzzle_letters = {central_letter.upper()} | {letter.upper() for letter in peripheral_letters}
+    n_words = sum(len(words) for _, words in valid_words)
+    if n_words == 0:
+        return f"No valid words for central letter {central_letter.upper()} and peripheral letters {', '.join(peripheral_letters)}."
+    lines = [f"Found {n_words} words for central letter {central_letter.upper()} and peripheral letters {', '.join(peripheral_letters)} (pangrams in bold):"]
+    for length, words in valid_words:
+        formatted_words = [f"**{word}**" if set(word) == puzzle_letters else word for word in words]
+        lines.append(f"- {length} letters ({len(words)}): {', '.join(formatted_words)}")
+    return "\n".join(lines)
+
+
+def answer_locally(message: str) -> Optional[str]:
+    """
+    Answers a structured puzzle message without the LLM, or returns None.
+    """
+    puzzle = parse_puzzle(message)
+    if puzzle is None:
+        return None
+    central_letter, peripheral_letters = puzzle
+    return format_solution(central_letter, peripheral_letters, spelling_bee(central_letter, peripheral_letters))
+#endregion Local fast path
+
+
+#region Compact tool output
+# The model only gets a dense summary of the tool result (counts, pangrams and the first words of each
+# length, up to TOOL_MAX_WORDS words); the full result travels as the ToolMessage artifact and is rendered
+# by the app itself. TOOL_MAX_WORDS is set by the environment variable SPELLING_BEE_TOOL_MAX_WORDS (0 = no limit).
+TOOL_MAX_WORDS = int(os.environ.get("SPELLING_BEE_TOOL_MAX_WORDS", 60))
+
+
+def compact_solution(central_letter: str, peripheral_letters: List[str], valid_words: List[Tuple[int, List[str]]],
+                     max_words: int = TOOL_MAX_WORDS) -> str:
+    """
+    Encodes a solution as a few lines, e.g.
+        E:AGLNOY 103 words, pangrams: none
+        8(3): ENNEAGON NONLEGAL OENOLOGY
+        ...
+        +41 words not shown, the full list of E:AGLNOY is displayed to the user
+    """
+    key = puzzle_key(central_letter, peripheral_letters)
+    puzzle_letters = set(key.replace(":", ""))
+    n_words = sum(len(words) for _, words in valid_words)
+    pangrams = [word for _, words in valid_words for word in words if set(word) == puzzle_letters]
+    lines = [f"{key} {n_words} words, pangrams: {' '.join(pangrams) or 'none'}"]
+    budget = max_words if max_words > 0 else n_words
+    for length, words in valid_words:
+        shown = words[:budget]
+        budget -= len(shown)
+        lines.append(f"{length}({len(words)}): {' '.join(shown + (['...'] if len(shown) < len(words) else []))}")
+    n_hidden = max(n_words - max_words, 0) if max_words > 0 else 0
+    if n_hidden:
+        lines.append(f"+{n_hidden} words not shown, the full list of {key} is displayed to the user")
+    return "\n".join(lines)
+
+
+def solution_artifact(central_letter: str, peripheral_letters: List[str], valid_words: List[Tuple[int, List[str]]]) -> Dict[str, Any]:
+    return {"central_letter": central_letter.upper(), "peripheral_letters": [letter.upper() for letter in peripheral_letters], "valid_words": valid_words}
+#endregion Compact tool output
+
+
+def spelling_bee_tool_result(central_letter: str, peripheral_letters: List[str]) -> Tuple[str, Dict[str, Any]]:
     """
     This tool takes the central letter and the peripherial letters from a given "Spelling Bee" 
-    puzzle and returns all the possible words that are valid (i.e. must contain the central letter, 
+    puzzle and finds all the possible words that are valid (i.e. must contain the central letter, 
     cannot contain a letter other than the central letter and peripheral letters, and must be contain 
-    more than 3 letters). The format of the output is a list of tuples. Each tuple contains a 
-    interger and a list of strings, the integer represents the length of the words in the correponding 
-    list of strings. The tuples inside the outer list are ordered from longest words to shortest words.
+    more than 3 letters). The output is a compact summary: a first line with the puzzle, the number 
+    of words and the pangrams, then one line per word length, longest first, in the format 
+    "length(number of words): word word ...". Long lists are truncated; the full list is always 
+    displayed to the user by the app.
 
     Args:
         central_letter (str): The central letter.
         peripheral_letters (List[str]): The peripheral letters.
     Returns:
-        List[Tuple[int, List[str]]]: The valid words.
+        str: The compact summary of the valid words.
     """
-    return spelling_bee(central_letter, peripheral_letters)
+    cache = get_cache()
+    key = puzzle_key(central_letter, peripheral_letters)
+    cached = cache.get("tool", key) if cache is not None else None
+    if cached is not None:
+        valid_words = [(length, words) for length, words in cached]
+    else:
+        valid_words = spelling_bee(central_letter, peripheral_letters)
+        if cache is not None:
+            cache.set("tool", key, valid_words)
+    return compact_solution(central_letter, peripheral_letters, valid_words), solution_artifact(central_letter, peripheral_letters, valid_words)
+
+
+_tool = None
+_tool_lock = threading.Lock()
+
+def get_spelling_bee_tool():
+    """
+    Returns the LangChain tool of spelling_bee_tool_result, built on first use so that the local fast path
+    and the pages do not import LangChain.
+    """
+    global _tool
+    with _tool_lock:
+        if _tool is None:
+            from langchain_core.tools import tool
+            _tool = tool("spelling_bee_tool", response_format="content_and_artifact")(spelling_bee_tool_result)
+        return _tool
+
+
+def __getattr__(name):
+    if name == "spelling_bee_tool":
+        return get_spelling_bee_tool()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 
@@ -1,55 +1,180 @@
-from utils.spelling_bee import spelling_bee_tool
+from utils.spelling_bee import answer_locally, format_solution, get_spelling_bee_tool
+from utils.spelling_bee_cache import get_cache, puzzle_key
+from utils import agent_runtime
+from utils.agent_runtime import llm_limiter
+from utils.agent_trace import traced, tracing
+import asyncio
+import hashlib
 import os
-from typing import List, TypedDict, Annotated, Sequence
-from dotenv import load_dotenv
-from langchain_mistralai import ChatMistralAI
-from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage, ToolMessage, AIMessage
-from langgraph.graph import StateGraph, END
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, AsyncIterator, Iterator, List, Optional, Tuple, TypedDict, Annotated, Sequence
 from operator import add as add_messages
 
-load_dotenv()
-api_key = os.environ["MISTRAL_API_KEY"]
-model = "mistral-large-latest"
-llm = ChatMistralAI(
-    model=model,
-    temperature=0
-)
-tools = [spelling_bee_tool]
-llm = llm.bind_tools(tools)
+if TYPE_CHECKING:
+    from langchain_core.messages import AIMessage, BaseMessage
+
+# The model client and the compiled graph are process-wide singletons built on first use: importing this module
+# (e.g. by the Streamlit page) does not import LangChain, langgraph, the model SDK or read .env, and locally
+# answered puzzles never do. Conversations may be LangChain messages or plain role/content dicts (as the page keeps them).
+_llm = None
+_llm_lock = threading.Lock()
+_agent = None
+_agent_lock = threading.Lock()
+
+def get_llm():
+    """
+    Returns the model with the tools bound, of the backend chosen by SPELLING_BEE_MODEL (see utils/agent_models.py).
+    """
+    global _llm
+    with _llm_lock:
+        if _llm is None:
+            from utils.agent_models import make_chat_model
+            _llm = make_chat_model().bind_tools([get_spelling_bee_tool()])
+        return _llm
+
+def set_chat_model(chat_model) -> None:
+    """
+    Replaces the model of the agent, e.g. by a FakeChatModel with a given latency for benchmarks.
+    """
+    global _llm
+    with _llm_lock:
+        _llm = chat_model.bind_tools([get_spelling_bee_tool()])
 
 class AgentState(TypedDict):
-    messages: Annotated[Sequence[BaseMessage], add_messages]
+    # LangChain messages, and the role/content dicts of the conversation window passed in
+    messages: Annotated[Sequence[Any], add_messages]
+
+def message_role(message) -> Optional[str]:
+    """
+    Returns "human", "ai", "tool" or "system" for a LangChain message or a role/content dict, without importing LangChain.
+    """
+    if isinstance(message, dict):
+        role = message.get("role")
+        return {"user": "human", "assistant": "ai"}.get(role, role)
+    message_type = getattr(message, "type", None)
+    # streamed model output comes as AIMessageChunk
+    return "ai" if message_type == "AIMessageChunk" else message_type
+
+def message_content(message):
+    return message.get("content") if isinstance(message, dict) else message.content
 
 system_prompt = """
 You are a Spelling Bee puzzle solver. Use the `spelling_bee` tool to find all valid words for a given central letter and peripheral letters.
-Always return the results as a list of tuples, grouped by word length.
+The app displays the full word list to the user, grouped by word length, so do not repeat it: answer briefly
+(number of words, pangrams, longest words) and only list the words the user explicitly asks about.
 """
 
+# Conversation window sent to the model: the last HISTORY_MAX_MESSAGES messages (starting with a user message),
+# earlier answers cut to HISTORY_MAX_CHARS characters. Set by SPELLING_BEE_HISTORY_MESSAGES / SPELLING_BEE_HISTORY_CHARS.
+HISTORY_MAX_MESSAGES = int(os.environ.get("SPELLING_BEE_HISTORY_MESSAGES", 6))
+HISTORY_MAX_CHARS = int(os.environ.get("SPELLING_BEE_HISTORY_CHARS", 500))
+
+def message_digest(content) -> str:
+    # same digest for messages differing only in case or spacing
+    return hashlib.sha1(" ".join(str(content).lower().split()).encode("utf-8")).hexdigest()[:16]
+
+def answer_cache_key(messages) -> Optional[str]:
+    """
+    Returns the cache key of the answer when the LLM is about to answer from the result of a single
+    spelling_bee tool call: the puzzle key plus a digest of the user message, since "which pangrams?" and
+    "only 5-letter words" about the same puzzle need different answers.
+    """
+    if len(messages) < 3 or message_role(messages[-1]) != "tool":
+        return None
+    request, question = messages[-2], messages[-3]
+    if message_role(request) != "ai" or len(getattr(request, "tool_calls", [])) != 1 or message_role(question) != "human":
+        return None
+    args = request.tool_calls[0]['args']
+    try:
+        return f"{puzzle_key(args['central_letter'], args['peripheral_letters'])}:{message_digest(message_content(question))}"
+    except (KeyError, AttributeError, TypeError):
+        return None
+
+def cached_answer(state: AgentState) -> Tuple[Optional[str], Optional["AIMessage"]]:
+    # final answers are cached per puzzle and question, so a popular puzzle costs one answer round trip per TTL
+    from langchain_core.messages import AIMessage
+    cache = get_cache()
+    key = answer_cache_key(list(state['messages'])) if cache is not None else None
+    if key is not None:
+        cached = cache.get("answer", key)
+        if cached is not None:
+            return key, AIMessage(content=cached)
+    return key, None
+
+def store_answer(key: Optional[str], message: "AIMessage") -> None:
+    if key is not None and not message.tool_calls and isinstance(message.content, str):
+        get_cache().set("answer", key, message.content)
+
 def call_llm(state: AgentState) -> AgentState:
-    messages = [SystemMessage(content=system_prompt)] + list(state['messages'])
-    message = llm.invoke(messages)
+    key, cached = cached_answer(state)
+    if cached is not None:
+        return {'messages': [cached]}
+    messages = [{"role": "system", "content": system_prompt}] + list(state['messages'])
+    with llm_limiter:
+        message = get_llm().invoke(messages)
+    store_answer(key, message)
     return {'messages': [message]}
 
+async def acall_llm(state: AgentState) -> AgentState:
+    key, cached = cached_answer(state)
+    if cached is not None:
+        return {'messages': [cached]}
+    messages = [{"role": "system", "content": system_prompt}] + list(state['messages'])
+    async with llm_limiter:
+        message = await get_llm().ainvoke(messages)
+    store_answer(key, message)
+    return {'messages': [message]}
+
+def tool_call(t) -> dict:
+    # invoked with the whole tool call, the tool returns a ToolMessage: the compact summary as content for the
+    # model and the full solution as artifact for the app
+    return {**t, 'type': 'tool_call'}
+
 def take_action(state: AgentState) -> AgentState:
+    # several tool calls of one turn run concurrently
     tool_calls = state['messages'][-1].tool_calls
-    results = []
-    for t in tool_calls:
-        result = spelling_bee_tool.invoke(t['args'])
-        results.append(ToolMessage(tool_call_id=t['id'], name=t['name'], content=str(result)))
-    return {'messages': results}
+    spelling_bee_tool = get_spelling_bee_tool()
+    if len(tool_calls) == 1:
+        return {'messages': [spelling_bee_tool.invoke(tool_call(tool_calls[0]))]}
+    with ThreadPoolExecutor(max_workers=len(tool_calls)) as executor:
+        return {'messages': list(executor.map(lambda t: spelling_bee_tool.invoke(tool_call(t)), tool_calls))}
 
-graph = StateGraph(AgentState)
-graph.add_node("llm", call_llm)
-graph.add_node("tools", take_action)
+async def atake_action(state: AgentState) -> AgentState:
+    tool_calls = state['messages'][-1].tool_calls
+    spelling_bee_tool = get_spelling_bee_tool()
+    return {'messages': list(await asyncio.gather(*(spelling_bee_tool.ainvoke(tool_call(t)) for t in tool_calls)))}
 
 def should_continue(state: AgentState):
     return hasattr(state['messages'][-1], 'tool_calls') and len(state['messages'][-1].tool_calls) > 0
 
-graph.add_conditional_edges("llm", should_continue, {True: "tools", False: END})
-graph.add_edge("tools", "llm")
-graph.set_entry_point("llm")
+def get_agent():
+    """
+    Returns the compiled agent graph, built once per process.
+    """
+    global _agent
+    with _agent_lock:
+        if _agent is None:
+            from langchain_core.runnables import RunnableLambda
+            from langgraph.graph import StateGraph, END
+            graph = StateGraph(AgentState)
+            # every node has a sync and an async implementation: invoke/stream use the former, ainvoke/astream the latter;
+            # each run is recorded as a span of the request trace (see utils/agent_trace.py)
+            graph.add_node("llm", RunnableLambda(traced("llm", call_llm), afunc=traced("llm", acall_llm)))
+            graph.add_node("tools", RunnableLambda(traced("tools", take_action), afunc=traced("tools", atake_action)))
+            graph.add_conditional_edges("llm", should_continue, {True: "tools", False: END})
+            graph.add_edge("tools", "llm")
+            graph.set_entry_point("llm")
+            _agent = graph.compile()
+        return _agent
 
-spelling_bee_agent = graph.compile()
+def __getattr__(name):
+    # the singletons under their former module-level names
+    if name == "llm":
+        return get_llm()
+    if name == "spelling_bee_agent":
+        return get_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def run_agent():
     """
@@ -61,24 +186,100 @@ def run_agent():
         if user_input.lower() in ['exit', 'quit']:
             break
         central_letter, *peripheral_letters = user_input.replace(" ", "").split(",")
-        messages = [HumanMessage(content=f"Solve for central letter '{central_letter}' and peripheral letters {peripheral_letters}")]
-        result = spelling_bee_agent.invoke({"messages": messages})
+        messages = [{"role": "human", "content": f"Solve for central letter '{central_letter}' and peripheral letters {peripheral_letters}"}]
         print("\n=== Results ===")
-        print(result['messages'][-1].content)
+        for token in stream_spelling_bee_reply(messages):
+            print(token, end="", flush=True)
+        print()
 
 def message_to_HumanMessage(message):
+    from langchain_core.messages import HumanMessage
     return HumanMessage(content=message)
 
 def message_to_AIMessage(message):
+    from langchain_core.messages import AIMessage
     return AIMessage(content=message)
 
-def spelling_bee_reply(messages: List[BaseMessage]):
-    messages_for_agent = [{"role": "human" if isinstance(msg, HumanMessage) else "ai", "content": msg.content} for msg in messages]
-    result = spelling_bee_agent.invoke({"messages": messages_for_agent})
+def to_agent_messages(messages: List["BaseMessage"]):
+    """
+    Returns the conversation window sent to the agent (see HISTORY_MAX_MESSAGES), so that prompts stay
+    the same size however long the chat gets.
+    """
+    window = list(messages)[-HISTORY_MAX_MESSAGES:]
+    while window and message_role(window[0]) != "human":
+        window = window[1:]
+    agent_messages = []
+    for i, msg in enumerate(window):
+        content = message_content(msg)
+        if i < len(window) - 1 and len(content) > HISTORY_MAX_CHARS:
+            content = content[:HISTORY_MAX_CHARS] + " ..."
+        agent_messages.append({"role": "human" if message_role(msg) == "human" else "ai", "content": content})
+    return agent_messages
+
+def render_solution(artifact) -> str:
+    return format_solution(artifact['central_letter'], artifact['peripheral_letters'], artifact['valid_words'])
+
+async def aspelling_bee_reply(messages: List["BaseMessage"]) -> str:
+    # structured puzzles are answered locally; the agent only handles free-form messages
+    if messages and message_role(messages[-1]) == "human":
+        answer = answer_locally(message_content(messages[-1]))
+        if answer is not None:
+            return answer
+    with tracing():
+        result = await get_agent().ainvoke({"messages": to_agent_messages(messages)})
     answer = result['messages'][-1].content
-    return answer
+    # the model only saw compact tool results: the full word lists are rendered here
+    solutions = [render_solution(msg.artifact) for msg in result['messages'] if message_role(msg) == "tool" and msg.artifact]
+    return "\n\n".join([answer] + solutions)
 
+def spelling_bee_reply(messages: List["BaseMessage"]) -> str:
+    # runs on the shared background loop, the calling thread only waits for the answer
+    return agent_runtime.run(aspelling_bee_reply(messages))
 
+async def astream_spelling_bee(messages: List["BaseMessage"]) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Streams a reply as ("token", text) pieces of the answer, as soon as the model produces them,
+    ("update", {node: state update}) graph events and ("solution", artifact) full tool results, to be
+    rendered with render_solution, then ("trace", trace) with the timings and token counts of the nodes.
+    Locally answered puzzles come as a single token.
+    """
+    if messages and message_role(messages[-1]) == "human":
+        answer = answer_locally(message_content(messages[-1]))
+        if answer is not None:
+            yield "token", answer
+            return
+    with tracing() as trace:
+        async for mode, event in get_agent().astream({"messages": to_agent_messages(messages)}, stream_mode=["messages", "updates"]):
+            if mode == "updates":
+                yield "update", event
+                for msg in (event.get("tools") or {}).get("messages", []):
+                    if message_role(msg) == "tool" and msg.artifact:
+                        yield "solution", msg.artifact
+                continue
+            chunk, metadata = event
+            # tool-call chunks have no text; cached answers arrive as one complete AIMessage
+            if metadata.get("langgraph_node") == "llm" and message_role(chunk) == "ai" and isinstance(chunk.content, str) and chunk.content:
+                yield "token", chunk.content
+    yield "trace", trace.as_dict()
+
+def stream_spelling_bee(messages: List["BaseMessage"]) -> Iterator[Tuple[str, Any]]:
+    """
+    Sync view of astream_spelling_bee, run on the shared background loop.
+    """
+    return agent_runtime.iterate(astream_spelling_bee(messages))
+
+def stream_spelling_bee_reply(messages: List["BaseMessage"]) -> Iterator[str]:
+    """
+    Streams only the text of the reply, e.g. for st.write_stream, followed by the full word lists.
+    """
+    solutions = []
+    for kind, value in stream_spelling_bee(messages):
+        if kind == "token":
+            yield value
+        elif kind == "solution":
+            solutions.append(value)
+    for artifact in solutions:
+        yield "\n\n" + render_solution(artifact)
 
 if __name__ == "__main__":
     run_agent()
\ No newline at end of file
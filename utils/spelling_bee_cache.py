@@ -0,0 +1,143 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+# Cache of Spelling Bee tool results and final agent answers, keyed by the normalized puzzle.
+# Configuration (environment variables):
+#   SPELLING_BEE_CACHE       "memory" (default, per process), a path to a SQLite file shared by every
+#                            worker process, or "off"
+#   SPELLING_BEE_CACHE_SIZE  maximum number of entries per namespace (default 1024), least recently used first out
+#   SPELLING_BEE_CACHE_TTL   lifetime of an entry in seconds (default 86400, a daily puzzle)
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL = 24 * 60 * 60
+
+
+def puzzle_key(central_letter: str, peripheral_letters: Iterable[str]) -> str:
+    """
+    Normalized key of a puzzle: "E:AGLNOY" for central letter E and peripheral letters in any order or case.
+    """
+    return f"{central_letter.strip().upper()}:{''.join(sorted({letter.strip().upper() for letter in peripheral_letters}))}"
+
+
+class MemoryCache:
+    """
+    In-process LRU cache with a size limit and a TTL. Values are stored as JSON so that both backends
+    return the same types.
+    """
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: Optional[float] = DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._namespaces: Dict[str, "OrderedDict[str, tuple[float, str]]"] = {}
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._lock:
+            entries = self._namespaces.setdefault(namespace, OrderedDict())
+            entry = entries.get(key)
+            if entry is not None and self.ttl is not None and time.time() - entry[0] > self.ttl:
+                del entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            entries.move_to_end(key)
+            self.hits += 1
+            return json.loads(entry[1])
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        with self._lock:
+            entries = self._namespaces.setdefault(namespace, OrderedDict())
+            entries[key] = (time.time(), json.dumps(value))
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = sum(len(entries) for entries in self._namespaces.values())
+            return {"entries": entries, "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class SqliteCache:
+    """
+    LRU cache with a size limit and a TTL in a SQLite file, so that every worker process (and every
+    restart) shares the entries. Hit/miss counters are per process.
+    """
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: Optional[float] = DEFAULT_TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache (namespace TEXT, key TEXT, value TEXT, created REAL, last_used REAL, "
+            "PRIMARY KEY (namespace, key))")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS cache_last_used ON cache (namespace, last_used)")
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute("SELECT value, created FROM cache WHERE namespace = ? AND key = ?", (namespace, key)).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self._connection.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._connection.execute("UPDATE cache SET last_used = ? WHERE namespace = ? AND key = ?", (now, namespace, key))
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        now = time.time()
+        with self._lock:
+            self._connection.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)", (namespace, key, json.dumps(value), now, now))
+            evicted = self._connection.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key IN (SELECT key FROM cache WHERE namespace = ? "
+                "ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (namespace, namespace, self.max_entries)).rowcount
+            self.evictions += max(evicted, 0)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            return {"entries": entries, "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """
+    Returns the process-wide cache configured by the environment, or None when caching is off.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            backend = os.environ.get("SPELLING_BEE_CACHE", "memory")
+            max_entries = int(os.environ.get("SPELLING_BEE_CACHE_SIZE", DEFAULT_MAX_ENTRIES))
+            ttl = float(os.environ.get("SPELLING_BEE_CACHE_TTL", DEFAULT_TTL))
+            if backend == "off":
+                _cache = False
+            elif backend == "memory":
+                _cache = MemoryCache(max_entries, ttl)
+            else:
+                _cache = SqliteCache(backend, max_entries, ttl)
+        return _cache or None
+
+
+def cache_stats() -> Dict[str, int]:
+    cache = get_cache()
+    return cache.stats() if cache is not None else {}
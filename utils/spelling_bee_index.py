@@ -0,0 +1,163 @@
+import os
+import struct
+import threading
+from array import array
+from typing import Dict, Iterable, List, Tuple
+from utils.word_store import letter_mask, load_word_store, open_or_build, pack_derived, unpack_derived
+
+# the dedicated Spelling Bee list is optional: without it the puzzles are solved from the Letter Boxed list
+SPELLING_BEE_WORDS_PATH = "pages/words_for_spelling_bee.txt"
+FALLBACK_WORDS_PATH = "pages/words_for_letter_boxed.txt"
+WORDS_PATH = SPELLING_BEE_WORDS_PATH if os.path.exists(SPELLING_BEE_WORDS_PATH) else FALLBACK_WORDS_PATH
+MIN_WORD_LENGTH = 4
+PUZZLE_LETTERS = 7
+
+#region Letter-mask index
+# Every word is keyed by the 26-bit mask of its distinct letters (bit 0 = "A"). A puzzle's valid words are
+# those whose mask contains the center letter and is a subset of the 7 puzzle letters, so a query is one
+# lookup per subset of the 6 peripheral letters (64 lookups) instead of a scan of the dictionary.
+# Only words that can ever be valid are indexed: at least MIN_WORD_LENGTH letters and at most PUZZLE_LETTERS
+# distinct letters. Words and masks come from the shared word store (see utils/word_store.py).
+#
+# Binary layout (little endian), after the derived-file header (see utils/word_store.py), keyed on the word store:
+#   counts:       mask count (I), word count (I)
+#   masks:        uint32[mask_count]      distinct letter masks, sorted
+#   pangram:      uint8[mask_count]       1 if the mask has PUZZLE_LETTERS letters
+#   mask_starts:  uint32[mask_count + 1]  words of masks[i] are entries mask_starts[i]:mask_starts[i + 1]
+#   positions:    uint32[word_count]      line number of the word in the word list
+#   lengths:      uint8[word_count]
+#   text_starts:  uint32[word_count + 1]  the word is text[text_starts[j]:text_starts[j + 1]]
+#   text:         ASCII, upper case
+INDEX_MAGIC = b"SBEEINDX"
+INDEX_VERSION = 1
+INDEX_COUNTS = struct.Struct("<II")
+
+
+class SpellingBeeIndex:
+    """
+    Read-only letter-mask index over a word list, backed by a single buffer (memory-mapped when persisted).
+    """
+    def __init__(self, buffer, verify: bool = True):
+        self._buffer = buffer
+        self.checksum, self.source_checksum, view = unpack_derived(buffer, INDEX_MAGIC, INDEX_VERSION, "Spelling Bee index", verify)
+        n_masks, n_words = INDEX_COUNTS.unpack_from(view)
+        offset = INDEX_COUNTS.size
+        self.masks = view[offset:offset + 4 * n_masks].cast("I")
+        offset += 4 * n_masks
+        self.pangram = view[offset:offset + n_masks]
+        offset += n_masks
+        self.mask_starts = view[offset:offset + 4 * (n_masks + 1)].cast("I")
+        offset += 4 * (n_masks + 1)
+        self.positions = view[offset:offset + 4 * n_words].cast("I")
+        offset += 4 * n_words
+        self.lengths = view[offset:offset + n_words]
+        offset += n_words
+        self.text_starts = view[offset:offset + 4 * (n_words + 1)].cast("I")
+        offset += 4 * (n_words + 1)
+        self.text = view[offset:]
+        self.mask_ids: Dict[int, int] = {mask: i for i, mask in enumerate(self.masks)}
+
+    def is_stale(self, path: str) -> bool:
+        return self.source_checksum != load_word_store(path).checksum
+
+    def word(self, j: int) -> str:
+        return bytes(self.text[self.text_starts[j]:self.text_starts[j + 1]]).decode("ascii")
+
+    def entries(self, mask: int) -> range:
+        i = self.mask_ids.get(mask)
+        if i is None:
+            return range(0)
+        return range(self.mask_starts[i], self.mask_starts[i + 1])
+
+    def valid_entries(self, central_letter: str, peripheral_letters: Iterable[str]) -> List[int]:
+        """
+        Returns the entries of the valid words, in word-list order.
+        """
+        center = letter_mask(central_letter.upper())
+        peripheral_bits = [1 << (ord(letter) - ord("A")) for letter in sorted(set(letter.upper() for letter in peripheral_letters))]
+        peripheral_bits = [bit for bit in peripheral_bits if bit != center]
+        entries = []
+        for subset in range(1 << len(peripheral_bits)):
+            mask = center
+            for k, bit in enumerate(peripheral_bits):
+                if subset >> k & 1:
+                    mask |= bit
+            entries.extend(self.entries(mask))
+        entries.sort(key=self.positions.__getitem__)
+        return entries
+
+    def solve(self, central_letter: str, peripheral_letters: Iterable[str]) -> List[Tuple[int, List[str]]]:
+        """
+        Returns the valid words grouped by length, longest first (word-list order within a length).
+        """
+        by_length: Dict[int, List[str]] = {}
+        for j in self.valid_entries(central_letter, peripheral_letters):
+            by_length.setdefault(self.lengths[j], []).append(self.word(j))
+        return [(length, by_length[length]) for length in sorted(by_length, reverse=True)]
+
+    def pangrams(self, central_letter: str, peripheral_letters: Iterable[str]) -> List[str]:
+        """
+        Returns the words that use every puzzle letter: a single lookup of the full puzzle mask.
+        """
+        mask = letter_mask(central_letter.upper()) | letter_mask(letter.upper() for letter in peripheral_letters)
+        i = self.mask_ids.get(mask)
+        if i is None or not self.pangram[i]:
+            return []
+        return [self.word(j) for j in sorted(self.entries(mask), key=self.positions.__getitem__)]
+
+
+def build_index_bytes(path: str) -> bytes:
+    store = load_word_store(path)
+    groups: Dict[int, List[Tuple[int, str]]] = {}
+    long_enough = range(store.length_starts[MIN_WORD_LENGTH], len(store)) if MIN_WORD_LENGTH <= store.max_length else range(0)
+    # in word-list order, which the entries of each mask keep
+    for j in sorted(long_enough, key=store.positions.__getitem__):
+        mask = store.masks[j]
+        if bin(mask).count("1") > PUZZLE_LETTERS:
+            continue
+        groups.setdefault(mask, []).append((store.positions[j], store.word(j)))
+
+    masks = array("I", sorted(groups))
+    pangram = bytes(1 if bin(mask).count("1") == PUZZLE_LETTERS else 0 for mask in masks)
+    mask_starts, positions, lengths, text_starts = array("I", [0]), array("I"), bytearray(), array("I", [0])
+    text = bytearray()
+    for mask in masks:
+        for position, word in groups[mask]:
+            positions.append(position)
+            lengths.append(len(word))
+            text += word.encode("ascii")
+            text_starts.append(len(text))
+        mask_starts.append(len(positions))
+
+    payload = (INDEX_COUNTS.pack(len(masks), len(positions)) + masks.tobytes() + pangram + mask_starts.tobytes() + positions.tobytes()
+               + bytes(lengths) + text_starts.tobytes() + bytes(text))
+    return pack_derived(INDEX_MAGIC, INDEX_VERSION, store.checksum, payload)
+
+
+def index_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".sbidx"
+
+
+_indexes: Dict[str, SpellingBeeIndex] = {}
+_indexes_lock = threading.Lock()
+
+def load_spelling_bee_index(path: str = WORDS_PATH) -> SpellingBeeIndex:
+    """
+    Returns the letter-mask index of the given word list. The index is serialized next to the word list
+    (rebuilt only when the word store changes) and memory-mapped, so the tool, the agent and the Streamlit page
+    share one copy per process.
+    """
+    def loader(buffer, verify: bool) -> SpellingBeeIndex:
+        index = SpellingBeeIndex(buffer, verify)
+        if index.is_stale(path):
+            raise ValueError("Spelling Bee index of another word store")
+        return index
+
+    key = os.path.abspath(path)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None or index.is_stale(path):
+            index = open_or_build(index_path(path), lambda: build_index_bytes(path), loader)
+            _indexes[key] = index
+        return index
+#endregion Letter-mask index
@@ -0,0 +1,261 @@
+import argparse
+import bisect
+import mmap
+import multiprocessing
+import os
+import struct
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+from utils.spelling_bee_index import PUZZLE_LETTERS, WORDS_PATH, SpellingBeeIndex, load_spelling_bee_index
+from utils.word_store import pack_derived, unpack_derived
+
+# Answer table: every puzzle (7-letter board with at least one pangram x center letter) solved offline.
+# Usage: python -m utils.spelling_bee_table --words pages/words_for_spelling_bee.txt --top 10
+
+#region Answer table
+# Binary layout (little endian), after the derived-file header (see utils/word_store.py), keyed on the index:
+#   counts:        puzzle count (I), answer count (I)
+#   keys:          uint32[puzzle_count]      board mask << 5 | center letter (0 = "A"), sorted
+#   scores:        uint32[puzzle_count]
+#   pangrams:      uint8[puzzle_count]       number of pangrams
+#   answer_starts: uint32[puzzle_count + 1]  answers of puzzle i are answers[answer_starts[i]:answer_starts[i + 1]]
+#   answers:       uint32[answer_count]      entries of the letter-mask index, in word-list order
+# The source checksum is that of the index the table was built from, so a stale table is ignored.
+TABLE_MAGIC = b"SBEETABL"
+TABLE_VERSION = 1
+TABLE_COUNTS = struct.Struct("<II")
+PANGRAM_BONUS = 7
+CHUNKS_PER_WORKER = 4
+
+
+def puzzle_key(board_mask: int, center: int) -> int:
+    return board_mask << 5 | center
+
+
+def word_score(length: int) -> int:
+    # 1 point for a 4-letter word, one point per letter above that (pangrams also earn PANGRAM_BONUS)
+    return 1 if length == 4 else length
+
+
+def board_letters(board_mask: int) -> List[int]:
+    return [letter for letter in range(26) if board_mask >> letter & 1]
+
+
+def solve_board(index: SpellingBeeIndex, board_mask: int) -> List[Tuple[int, int, int, List[int]]]:
+    """
+    Returns (key, score, pangram count, answer entries) for the 7 centers of a board. The entries of the
+    128 sub-masks of the board are looked up once and shared by the 7 centers.
+    """
+    letters = board_letters(board_mask)
+    subset_entries = []
+    for subset in range(1 << len(letters)):
+        mask = 0
+        for k, letter in enumerate(letters):
+            if subset >> k & 1:
+                mask |= 1 << letter
+        subset_entries.append((mask, index.entries(mask)))
+    puzzles = []
+    n_pangrams = len(index.entries(board_mask))
+    for center in letters:
+        entries = [j for mask, mask_entries in subset_entries if mask >> center & 1 for j in mask_entries]
+        entries.sort(key=index.positions.__getitem__)
+        score = sum(word_score(index.lengths[j]) for j in entries) + PANGRAM_BONUS * n_pangrams
+        puzzles.append((puzzle_key(board_mask, center), score, n_pangrams, entries))
+    return puzzles
+
+
+class AnswerTable:
+    """
+    Read-only answer table over a letter-mask index, backed by a single buffer (memory-mapped when persisted).
+    """
+    def __init__(self, buffer, index: SpellingBeeIndex, verify: bool = True):
+        self._buffer = buffer
+        self.index = index
+        self.checksum, self.source_checksum, view = unpack_derived(buffer, TABLE_MAGIC, TABLE_VERSION, "Spelling Bee answer table", verify)
+        n_puzzles, n_answers = TABLE_COUNTS.unpack_from(view)
+        offset = TABLE_COUNTS.size
+        self.keys = view[offset:offset + 4 * n_puzzles].cast("I")
+        offset += 4 * n_puzzles
+        self.scores = view[offset:offset + 4 * n_puzzles].cast("I")
+        offset += 4 * n_puzzles
+        self.pangrams = view[offset:offset + n_puzzles]
+        offset += n_puzzles
+        self.answer_starts = view[offset:offset + 4 * (n_puzzles + 1)].cast("I")
+        offset += 4 * (n_puzzles + 1)
+        self.answers = view[offset:offset + 4 * n_answers].cast("I")
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def matches(self, index: SpellingBeeIndex) -> bool:
+        return self.source_checksum == index.checksum
+
+    def find(self, central_letter: str, peripheral_letters: Sequence[str]) -> Optional[int]:
+        """
+        Returns the row of the puzzle, or None when it is not in the table (not 7 distinct letters, or no pangram).
+        """
+        center = ord(central_letter.upper()) - ord("A")
+        board_mask = 1 << center
+        for letter in peripheral_letters:
+            board_mask |= 1 << (ord(letter.upper()) - ord("A"))
+        if bin(board_mask).count("1") != PUZZLE_LETTERS:
+            return None
+        key = puzzle_key(board_mask, center)
+        i = bisect.bisect_left(self.keys, key)
+        return i if i < len(self.keys) and self.keys[i] == key else None
+
+    def answer_entries(self, i: int) -> memoryview:
+        return self.answers[self.answer_starts[i]:self.answer_starts[i + 1]]
+
+    def solve(self, i: int) -> List[Tuple[int, List[str]]]:
+        """
+        Returns the answers of row i in the format of SpellingBeeIndex.solve.
+        """
+        by_length: Dict[int, List[str]] = {}
+        for j in self.answer_entries(i):
+            by_length.setdefault(self.index.lengths[j], []).append(self.index.word(j))
+        return [(length, by_length[length]) for length in sorted(by_length, reverse=True)]
+
+    def describe(self, i: int) -> Dict:
+        key = self.keys[i]
+        center = key & 31
+        return {
+            "center": chr(ord("A") + center),
+            "peripherals": "".join(chr(ord("A") + letter) for letter in board_letters(key >> 5) if letter != center),
+            "answers": self.answer_starts[i + 1] - self.answer_starts[i],
+            "score": self.scores[i],
+            "pangrams": self.pangrams[i],
+        }
+
+    def top(self, column: str = "score", k: int = 10, ascending: bool = False) -> List[Dict]:
+        """
+        Returns the k puzzles with the highest (or lowest) "score", "answers" or "pangrams".
+        """
+        if column == "score":
+            values = self.scores
+        elif column == "answers":
+            values = [self.answer_starts[i + 1] - self.answer_starts[i] for i in range(len(self))]
+        elif column == "pangrams":
+            values = self.pangrams
+        else:
+            raise ValueError(f"Unknown column: {column}")
+        rows = sorted(range(len(self)), key=values.__getitem__, reverse=not ascending)[:k]
+        return [self.describe(i) for i in rows]
+
+
+def build_table_bytes(words_path: str = WORDS_PATH, workers: Optional[int] = 1) -> bytes:
+    """
+    Solves every puzzle of the word list. Boards are split into chunks that are solved in order by a pool
+    of worker processes, each mapping the same persisted index.
+    """
+    index = load_spelling_bee_index(words_path)
+    boards = [mask for mask, is_pangram in zip(index.masks, index.pangram) if is_pangram]
+    workers = min(workers or os.cpu_count() or 1, os.cpu_count() or 1)
+    if workers <= 1:
+        results = [_solve_boards_with(index, boards)]
+    else:
+        n_chunks = workers * CHUNKS_PER_WORKER
+        chunk_size = -(-len(boards) // n_chunks)
+        chunks = [boards[start:start + chunk_size] for start in range(0, len(boards), chunk_size)]
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(words_path,)
+        ) as executor:
+            results = list(executor.map(_solve_boards, chunks))
+
+    keys, scores, pangrams, answer_starts, answers = array("I"), array("I"), bytearray(), array("I", [0]), array("I")
+    for chunk_keys, chunk_scores, chunk_pangrams, chunk_counts, chunk_answers in results:
+        keys += chunk_keys
+        scores += chunk_scores
+        pangrams += chunk_pangrams
+        for count in chunk_counts:
+            answer_starts.append(answer_starts[-1] + count)
+        answers += chunk_answers
+    payload = TABLE_COUNTS.pack(len(keys), len(answers)) + keys.tobytes() + scores.tobytes() + bytes(pangrams) + answer_starts.tobytes() + answers.tobytes()
+    return pack_derived(TABLE_MAGIC, TABLE_VERSION, index.checksum, payload)
+
+
+def table_path(words_path: str) -> str:
+    return os.path.splitext(words_path)[0] + ".sbtable"
+
+
+_tables: Dict[str, Tuple[SpellingBeeIndex, Optional[AnswerTable]]] = {}
+_tables_lock = threading.Lock()
+
+def load_answer_table(words_path: str = WORDS_PATH) -> Optional[AnswerTable]:
+    """
+    Returns the memory-mapped answer table of the word list, once per process, or None when it has not been
+    built or was built from a different version of the word list. The table is only built by the batch job.
+    """
+    key = os.path.abspath(words_path)
+    index = load_spelling_bee_index(words_path)
+    with _tables_lock:
+        cached = _tables.get(key)
+        if cached is None or cached[0] is not index:
+            table = None
+            try:
+                with open(table_path(words_path), "rb") as f:
+                    table = AnswerTable(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), index)
+                if not table.matches(index):
+                    table = None
+            except (OSError, ValueError, struct.error):
+                table = None
+            _tables[key] = (index, table)
+        return _tables[key][1]
+#endregion Answer table
+
+
+#region Process pool workers
+_worker_index: Optional[SpellingBeeIndex] = None
+
+def _init_worker(words_path: str) -> None:
+    # every worker maps the index persisted by the parent
+    global _worker_index
+    _worker_index = load_spelling_bee_index(words_path)
+
+def _solve_boards_with(index: SpellingBeeIndex, boards: Sequence[int]) -> Tuple[array, array, bytes, array, array]:
+    keys, scores, pangrams, counts, answers = array("I"), array("I"), bytearray(), array("I"), array("I")
+    for board_mask in boards:
+        for key, score, n_pangrams, entries in solve_board(index, board_mask):
+            keys.append(key)
+            scores.append(score)
+            pangrams.append(n_pangrams)
+            counts.append(len(entries))
+            answers.extend(entries)
+    return keys, scores, bytes(pangrams), counts, answers
+
+def _solve_boards(boards: Sequence[int]) -> Tuple[array, array, bytes, array, array]:
+    return _solve_boards_with(_worker_index, boards)
+#endregion Process pool workers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve every Spelling Bee puzzle of a word list into an answer table.")
+    parser.add_argument("--words", default=WORDS_PATH)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--top", type=int, default=10, help="number of boards listed by the analytics")
+    args = parser.parse_args()
+
+    data = build_table_bytes(args.words, args.workers)
+    path = table_path(args.words)
+    # write next to the destination first so that running apps never map a partial file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    table = load_answer_table(args.words)
+    print(f"Saved {len(table)} puzzles ({len(table.answers)} answers) to {path}")
+
+    for title, column, ascending in [("Highest-scoring puzzles", "score", False), ("Puzzles with the most answers", "answers", False),
+                                     ("Puzzles with the fewest answers", "answers", True), ("Puzzles with the most pangrams", "pangrams", False)]:
+        print(f"\n{title}:")
+        for row in table.top(column, args.top, ascending):
+            print(f"  {row['center']} {row['peripherals']}: {row['answers']} answers, {row['score']} points, {row['pangrams']} pangrams")
+
+
+if __name__ == "__main__":
+    main()
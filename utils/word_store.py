@@ -0,0 +1,252 @@
+import argparse
+import mmap
+import os
+import struct
+import threading
+import zlib
+from array import array
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+# Word store: a word list parsed once into the columns every game derives its structures from, persisted next to
+# the .txt in a versioned, checksummed binary file that is memory-mapped read-only, so every session and every
+# worker process shares the same pages. Words are normalized once: stripped, upper case, ASCII letters only,
+# first occurrence kept. They are grouped in length buckets, in word-list order within a bucket, so the words of
+# one length are a contiguous block of per-position letter codes (Wordle's encoded word matrix, without a copy).
+# Usage: python -m utils.word_store  (builds the stores of the three games' word lists)
+#
+# Binary layout (little endian):
+#   header: magic (8s), format version (I), CRC-32 of everything after the header (I), source size (Q),
+#           source mtime in ns (Q), word count (I), max word length (I)
+#   length_starts: uint32[max_length + 2]  words of length L are entries length_starts[L]:length_starts[L + 1]
+#   positions:     uint32[word_count]      line number of the word in the word list
+#   masks:         uint32[word_count]      distinct letters of the word (bit 0 = "A")
+#   alphabetical:  uint32[word_count]      entries in alphabetical order
+#   text_starts:   uint32[word_count + 1]  the word is text[text_starts[j]:text_starts[j + 1]]
+#   text:          ASCII, upper case
+STORE_MAGIC = b"WORDSTOR"
+STORE_VERSION = 1
+STORE_HEADER = struct.Struct("<8sIIQQII")
+
+# Files derived from a word store (the Letter Boxed trie, the Spelling Bee index and answer table) start with:
+#   magic (8s), format version (I), CRC-32 of everything after the header (I), CRC-32 of the file it was built from (I)
+# so they are checked like the store and rebuilt when their source changes, whatever the .txt mtime says.
+DERIVED_HEADER = struct.Struct("<8sIII")
+
+T = TypeVar("T")
+
+
+def letter_mask(letters: Iterable[str]) -> int:
+    mask = 0
+    for letter in letters:
+        mask |= 1 << (ord(letter) - ord("A"))
+    return mask
+
+
+def normalize_word(line: str) -> Optional[str]:
+    word = line.strip().upper()
+    return word if word.isascii() and word.isalpha() else None
+
+
+class WordStore:
+    """
+    Read-only word store over a single buffer (memory-mapped when persisted). Entries are numbered in
+    length-bucket order; positions gives the line of each entry in the source list.
+    """
+    def __init__(self, buffer, verify: bool = True):
+        self._buffer = buffer
+        view = memoryview(buffer)
+        magic, version, self.checksum, self.source_size, self.source_mtime_ns, n_words, self.max_length = STORE_HEADER.unpack_from(view)
+        if magic != STORE_MAGIC:
+            raise ValueError("Not a word store file")
+        if version != STORE_VERSION:
+            raise ValueError(f"Word store format version {version}, expected {STORE_VERSION}")
+        if verify and zlib.crc32(view[STORE_HEADER.size:]) != self.checksum:
+            raise ValueError("Corrupted word store (checksum mismatch)")
+        offset = STORE_HEADER.size
+        self.length_starts = view[offset:offset + 4 * (self.max_length + 2)].cast("I")
+        offset += 4 * (self.max_length + 2)
+        self.positions = view[offset:offset + 4 * n_words].cast("I")
+        offset += 4 * n_words
+        self.masks = view[offset:offset + 4 * n_words].cast("I")
+        offset += 4 * n_words
+        self.alphabetical = view[offset:offset + 4 * n_words].cast("I")
+        offset += 4 * n_words
+        self.text_starts = view[offset:offset + 4 * (n_words + 1)].cast("I")
+        offset += 4 * (n_words + 1)
+        self.text = view[offset:]
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def is_stale(self, path: str) -> bool:
+        stat = os.stat(path)
+        return stat.st_size != self.source_size or stat.st_mtime_ns != self.source_mtime_ns
+
+    def word(self, j: int) -> str:
+        return bytes(self.text[self.text_starts[j]:self.text_starts[j + 1]]).decode("ascii")
+
+    def length(self, j: int) -> int:
+        return self.text_starts[j + 1] - self.text_starts[j]
+
+    def entries(self, length: Optional[int] = None) -> range:
+        """
+        Returns the entries of the words of the given length (all entries when None).
+        """
+        if length is None:
+            return range(len(self))
+        if not 0 <= length <= self.max_length:
+            return range(0)
+        return range(self.length_starts[length], self.length_starts[length + 1])
+
+    def words(self, length: Optional[int] = None) -> List[str]:
+        """
+        Returns the words of the given length in word-list order (all words, by length then word-list order, when None).
+        """
+        entries = self.entries(length)
+        if not entries:
+            return []
+        block = bytes(self.text[self.text_starts[entries.start]:self.text_starts[entries.stop]]).decode("ascii")
+        if length is not None:
+            return [block[i:i + length] for i in range(0, len(block), length)]
+        base = self.text_starts[entries.start]
+        return [block[self.text_starts[j] - base:self.text_starts[j + 1] - base] for j in entries]
+
+    def letter_codes(self, length: int) -> memoryview:
+        """
+        Returns the ASCII codes of the words of the given length as one row-major (words, length) block.
+        """
+        entries = self.entries(length)
+        if not entries:
+            return self.text[0:0]
+        return self.text[self.text_starts[entries.start]:self.text_starts[entries.stop]]
+
+
+def build_store_bytes(path: str) -> bytes:
+    stat = os.stat(path)
+    seen = set()
+    buckets: Dict[int, List[tuple]] = {}
+    with open(path) as f:
+        for position, line in enumerate(f):
+            word = normalize_word(line)
+            if word is None or word in seen:
+                continue
+            seen.add(word)
+            buckets.setdefault(len(word), []).append((position, word))
+
+    max_length = max(buckets, default=0)
+    length_starts, positions, masks, text_starts = array("I", [0]), array("I"), array("I"), array("I", [0])
+    words = []
+    text = bytearray()
+    for length in range(max_length + 1):
+        for position, word in buckets.get(length, []):
+            positions.append(position)
+            masks.append(letter_mask(word))
+            words.append(word)
+            text += word.encode("ascii")
+            text_starts.append(len(text))
+        length_starts.append(len(positions))
+    alphabetical = array("I", sorted(range(len(words)), key=words.__getitem__))
+
+    payload = length_starts.tobytes() + positions.tobytes() + masks.tobytes() + alphabetical.tobytes() + text_starts.tobytes() + bytes(text)
+    header = STORE_HEADER.pack(STORE_MAGIC, STORE_VERSION, zlib.crc32(payload), stat.st_size, stat.st_mtime_ns, len(words), max_length)
+    return header + payload
+
+
+def store_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".words"
+
+
+def pack_derived(magic: bytes, version: int, source_checksum: int, payload: bytes) -> bytes:
+    return DERIVED_HEADER.pack(magic, version, zlib.crc32(payload), source_checksum) + payload
+
+
+def unpack_derived(buffer, magic: bytes, version: int, name: str, verify: bool = True) -> Tuple[int, int, memoryview]:
+    """
+    Checks the header of a derived file and returns its checksum, the checksum of its source and its payload.
+    """
+    view = memoryview(buffer)
+    file_magic, file_version, checksum, source_checksum = DERIVED_HEADER.unpack_from(view)
+    if file_magic != magic:
+        raise ValueError(f"Not a {name} file")
+    if file_version != version:
+        raise ValueError(f"{name} format version {file_version}, expected {version}")
+    payload = view[DERIVED_HEADER.size:]
+    if verify and zlib.crc32(payload) != checksum:
+        raise ValueError(f"Corrupted {name} (checksum mismatch)")
+    return checksum, source_checksum, payload
+
+
+def open_or_build(path: str, build_bytes: Callable[[], bytes], loader: Callable[[Any, bool], T]) -> T:
+    """
+    Returns loader(buffer, verify) over the memory-mapped file at path. When the file is missing or the loader
+    rejects it with a ValueError (format version, checksum, stale source), it is rebuilt from build_bytes() and
+    replaced atomically, so concurrent processes never map a half-written file. When it cannot be written
+    (read-only deployment), the rebuilt data is kept in this process only.
+    """
+    try:
+        with open(path, "rb") as f:
+            return loader(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), True)
+    except (OSError, ValueError, struct.error):
+        pass
+
+    data = build_bytes()
+    try:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with open(path, "rb") as f:
+            return loader(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), False)
+    except OSError:
+        return loader(data, False)
+
+
+_stores: Dict[str, WordStore] = {}
+_stores_lock = threading.Lock()
+
+def load_word_store(path: str) -> WordStore:
+    """
+    Returns the word store of the given word list, once per process. The store is serialized next to the word
+    list (rebuilt when the .txt changes, or when the file has another format version or a bad checksum) and
+    memory-mapped, so every game, session and worker process reads the same copy.
+    """
+    def loader(buffer, verify: bool) -> WordStore:
+        store = WordStore(buffer, verify)
+        if store.is_stale(path):
+            raise ValueError("Word store of another version of the word list")
+        return store
+
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None or store.is_stale(path):
+            store = open_or_build(store_path(path), lambda: build_store_bytes(path), loader)
+            _stores[key] = store
+        return store
+
+
+def main():
+    from utils.letter_boxed import load_trie, trie_path
+    from utils.spelling_bee_index import WORDS_PATH as SPELLING_BEE_WORDS_PATH, index_path, load_spelling_bee_index
+    from utils.wordle_patterns import WORDS_PATH as WORDLE_WORDS_PATH, load_pattern_table, matrix_path
+
+    parser = argparse.ArgumentParser(description="Build the word stores of the three games and the caches derived from them.")
+    parser.add_argument("--wordle", default=WORDLE_WORDS_PATH)
+    parser.add_argument("--letter-boxed", default="pages/words_for_letter_boxed.txt")
+    parser.add_argument("--spelling-bee", default=SPELLING_BEE_WORDS_PATH)
+    args = parser.parse_args()
+
+    for path in dict.fromkeys([args.wordle, args.letter_boxed, args.spelling_bee]):
+        store = load_word_store(path)
+        lengths = {length: len(store.entries(length)) for length in range(store.max_length + 1) if store.entries(length)}
+        print(f"{store_path(path)}: {len(store)} words, by length {lengths}")
+    load_trie(args.letter_boxed)
+    print(f"{trie_path(args.letter_boxed)}: Letter Boxed trie")
+    load_spelling_bee_index(args.spelling_bee)
+    print(f"{index_path(args.spelling_bee)}: Spelling Bee letter-mask index")
+    # the Wordle bitset index is built in memory from the store
+    matrix = load_pattern_table(args.wordle, matrix_path(args.wordle)).matrix
+    print(f"{matrix_path(args.wordle)}: Wordle pattern matrix, {matrix.shape[0]}x{matrix.shape[1]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import random
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple, Union
+from utils.wordle_index import WordleIndex, load_wordle_index
+
+if TYPE_CHECKING:
+    from utils.wordle_patterns import PatternTable
+
+# Headless Wordle solver core: the Streamlit page and the offline simulator share these functions,
+# none of which touches st.session_state. The pattern table, the strategies and the opening book (numpy) are
+# imported on the first suggestion, so importing this module stays cheap for the page.
+
+WORDS_PATH = "pages/words_for_wordle.txt"
+MATRIX_PATH = "pages/words_for_wordle.patterns"
+word_length = 5
+
+STRATEGIES = {
+    1: "Random word from all words",
+    2: "Random word from the possible words",
+    3: "Possible word with the most new letters",
+    4: "Word with the most new letters",
+    5: "Possible word with the highest expected information",
+    6: "Word with the highest expected information",
+    7: "Word with the smallest worst case",
+}
+
+
+#region Useful functions
+def is_plausible_word(word, known_present_letters, known_absent_letters, known_absent_letters_in_positions, my_word):
+    check_1 = all([True if letter in word else False for letter in known_present_letters])
+    for letter in known_present_letters:
+        occurrence = known_present_letters[letter]
+        if type(occurrence) == str:
+            occurrence = int(occurrence)
+            if word.count(letter) != occurrence:
+                return False
+        else:
+            if word.count(letter) < occurrence:
+                return False
+    check_2 = all([True if letter not in known_absent_letters else False for letter in word])
+    check_3 = all([True if word[i] not in known_absent_letters_in_positions[i] else False for i in range(len(word))])
+    check_4 = all([True if my_word[i] is None or my_word[i] == word[i] else False for i in range(len(word))])
+    return check_1 and check_2 and check_3 and check_4
+
+
+def information_value(word, known_present_letters, known_absent_letters):
+    value = len(set(word).difference(set(known_present_letters.keys()).union(set(known_absent_letters))))
+    return value
+#endregion Useful functions
+
+
+def new_game_state(index: Optional[WordleIndex] = None) -> Dict:
+    """
+    Returns the collected information variables of a new game, sized for the word length of the index.
+    """
+    index = index or load_wordle_index(WORDS_PATH, word_length)
+    return {
+        "known_present_letters": {}, # value = letter occurence (if value is a string, letter occurence is exact)
+        "known_absent_letters": [],
+        "known_absent_letters_in_positions": {i: set() for i in range(index.word_length)},
+        "my_word": [None] * index.word_length,
+        "possible_solutions_bits": index.all_bits,
+    }
+
+
+#region Define strategy function
+def suggestion_choices(n, possible_solutions, known_present_letters, known_absent_letters,
+                       all_words: List[str], pattern_table: "PatternTable", **minimax_options) -> List[str]:
+    """
+    Returns the words strategy n picks from at random (a single word for the deterministic strategies).
+    minimax_options are passed to minimax_guess for strategy 7, e.g. time_budget (seconds, None for no limit).
+    """
+    from utils.wordle_strategies import best_guess, minimax_guess
+    if n == 1: # Strategy 1: guess a random word from the all words
+        return all_words
+
+    elif n == 2: # Strategy 2: guess a random word from the possible words
+        return possible_solutions
+
+    elif n == 3: # Strategy 3: guess a word that is possible and provides information according to letter variety
+        possible_solutions_with_information = {}
+        for word in possible_solutions:
+            value = information_value(word, known_present_letters, known_absent_letters)
+            if value not in possible_solutions_with_information:
+                possible_solutions_with_information[value] = []
+            possible_solutions_with_information[value].append(word)
+        max_value = max(possible_solutions_with_information.keys())
+        return possible_solutions_with_information[max_value]
+
+    elif n == 4: # Strategy 4: guess a word that provides as much information (not necessarily possible) according to letter variety
+        words_with_information = {}
+        for word in all_words:
+            value = information_value(word, known_present_letters, known_absent_letters)
+            if value not in words_with_information:
+                words_with_information[value] = []
+            words_with_information[value].append(word)
+        max_value = max(words_with_information.keys())
+        return words_with_information[max_value]
+
+    elif n == 5: # Strategy 5: guess the possible word that maximizes the expected information (entropy of the feedback over the possible words)
+        return [best_guess(pattern_table, possible_solutions, from_all_words=False)]
+
+    elif n == 6: # Strategy 6: guess the word (not necessarily possible) that maximizes the expected information over the possible words
+        return [best_guess(pattern_table, possible_solutions, from_all_words=True)]
+
+    elif n == 7: # Strategy 7: guess the word that minimizes the worst case (largest feedback bucket, or guesses needed for small sets)
+        return [minimax_guess(pattern_table, possible_solutions, **minimax_options)]
+
+    raise ValueError(f"Unknown strategy: {n}")
+
+
+def suggest_word(n, possible_solutions, known_present_letters, known_absent_letters, try_1=None,
+                 all_words: Optional[List[str]] = None, pattern_table: Optional["PatternTable"] = None, rng=random,
+                 history: Optional[List[Tuple[str, List[str]]]] = None):
+    """
+    Suggests the next guess with strategy n, unless a custom word (try_1) is given. history is the list of
+    (guess, feedback) pairs played so far; early turns are then answered from the opening book when it
+    covers them, and computed live otherwise.
+    """
+    if try_1 is None:
+        from utils.wordle_opening_book import load_opening_book
+        from utils.wordle_patterns import load_pattern_table
+        choices = None
+        if history is not None:
+            book = load_opening_book()
+            if book is not None:
+                choices = book.lookup(n, history)
+        if choices is None:
+            pattern_table = pattern_table or load_pattern_table(WORDS_PATH, MATRIX_PATH, word_length)
+            all_words = all_words or pattern_table.words
+            choices = suggestion_choices(n, possible_solutions, known_present_letters, known_absent_letters, all_words, pattern_table)
+        try_1 = choices[0] if len(choices) == 1 else rng.choice(choices)
+    return try_1
+
+
+def store_feedback_information(try_1, feedback_1, known_present_letters: Dict[str, Union[int, str]], known_absent_letters: List[str],
+                               known_absent_letters_in_positions: Dict[int, Set[str]], my_word: List[Optional[str]],
+                               possible_solutions_bits: int, index: Optional[WordleIndex] = None) -> int:
+    """
+    Stores the feedback of a guess into the collected information variables (updated in place) and returns
+    the bitset of the possible solutions that remain plausible. Works for any word length.
+    """
+    index = index or load_wordle_index(WORDS_PATH, word_length)
+    length = len(try_1)
+    for i in range(length):
+        if feedback_1[i] == "Green" and my_word[i] is None: # i.e. correctly positioned
+            my_word[i] = try_1[i]
+        elif feedback_1[i] == "Green" and my_word[i] is not None and my_word[i] != try_1[i]: # i.e. two correctly positioned letters interfering
+            my_word[i] = "?"
+        if feedback_1[i] == "Orange" and my_word[i] is None: # i.e. present but incorrectly positioned
+            known_absent_letters_in_positions[i].add(try_1[i])
+        if feedback_1[i] in ["Orange", "Green"]: # i.e. present inside target word
+            if type(known_present_letters.get(try_1[i])) != str: # i.e. occurrence is not yet known
+                occurrence_in_target = len([True for j in range(length) if feedback_1[j] in ["Orange", "Green"] and try_1[j] == try_1[i]])
+                occurrence_black_in_target = len([True for j in range(length) if feedback_1[j] == "Black" and try_1[j] == try_1[i]])
+                if occurrence_black_in_target == 0:
+                    if known_present_letters.get(try_1[i]) is None:
+                        known_present_letters[try_1[i]] = occurrence_in_target
+                    else:
+                        known_present_letters[try_1[i]] = max(known_present_letters[try_1[i]], occurrence_in_target)
+                else:
+                    known_present_letters[try_1[i]] = str(occurrence_in_target)
+        elif feedback_1[i] == "Black" and try_1[i] not in known_absent_letters: # i.e. not present (unless occurrence in try is greater than 1)
+            occurrence_in_try = try_1.count(try_1[i])
+            if occurrence_in_try == 1:
+                known_absent_letters.append(try_1[i])
+            else:
+                if type(known_present_letters.get(try_1[i])) != str: # i.e. occurrence is not yet known
+                    occurrence_in_target = len([True for j in range(length) if feedback_1[j] in ["Orange", "Green"] and try_1[j] == try_1[i]])
+                    if occurrence_in_target == 0:
+                        known_absent_letters.append(try_1[i])
+                    else:
+                        known_present_letters[try_1[i]] = str(occurrence_in_target)
+    return possible_solutions_bits & index.candidates(known_present_letters, known_absent_letters, known_absent_letters_in_positions, my_word)
+#endregion
@@ -0,0 +1,78 @@
+from typing import Dict, Iterable, List, Optional, Set, Union
+from functools import lru_cache
+from utils.word_store import load_word_store
+
+
+class WordleIndex:
+    """
+    Inverted bitset index over a Wordle word list. Bit j of every bitset stands for words[j], and bitsets
+    are plain Python ints, so combining constraints is a handful of bitwise operations over len(words)/64
+    machine words and a set of candidates is a single int.
+    """
+    def __init__(self, words: List[str], word_length: int = 5):
+        self.words = words
+        self.word_length = word_length
+        self.all_bits = (1 << len(words)) - 1
+
+        # position_letter[(i, letter)] = words with letter at position i
+        # letter_at_least[(letter, k)] = words containing letter at least k times
+        position_letter: Dict[tuple, int] = {}
+        letter_at_least: Dict[tuple, int] = {}
+        for j, word in enumerate(words):
+            bit = 1 << j
+            counts = {}
+            for i, letter in enumerate(word):
+                position_letter[(i, letter)] = position_letter.get((i, letter), 0) | bit
+                counts[letter] = counts.get(letter, 0) + 1
+            for letter, count in counts.items():
+                for k in range(1, count + 1):
+                    letter_at_least[(letter, k)] = letter_at_least.get((letter, k), 0) | bit
+        self.position_letter = position_letter
+        self.letter_at_least = letter_at_least
+
+    def at_least(self, letter: str, k: int) -> int:
+        if k <= 0:
+            return self.all_bits
+        return self.letter_at_least.get((letter, k), 0)
+
+    def candidates(self, known_present_letters: Dict[str, Union[int, str]], known_absent_letters: Iterable[str],
+                   known_absent_letters_in_positions: Dict[int, Set[str]], my_word: List[Optional[str]]) -> int:
+        """
+        Returns the bitset of words satisfying the same constraints as is_plausible_word: present letters with
+        a minimum occurrence (int) or an exact occurrence (str), absent letters, letters excluded from a position
+        and confirmed positions.
+        """
+        bits = self.all_bits
+        for letter, occurrence in known_present_letters.items():
+            if type(occurrence) == str:
+                occurrence = int(occurrence)
+                bits &= self.at_least(letter, occurrence) & ~self.at_least(letter, occurrence + 1)
+            else:
+                bits &= self.at_least(letter, occurrence)
+        for letter in known_absent_letters:
+            bits &= ~self.at_least(letter, 1)
+        for i, letters in known_absent_letters_in_positions.items():
+            for letter in letters:
+                bits &= ~self.position_letter.get((i, letter), 0)
+        for i, letter in enumerate(my_word):
+            if letter is not None:
+                bits &= self.position_letter.get((i, letter), 0)
+        return bits
+
+    def words_from_bits(self, bits: int) -> List[str]:
+        words = self.words
+        result = []
+        for byte_index, byte in enumerate(bits.to_bytes((len(words) + 7) // 8, "little")):
+            while byte:
+                low = byte & -byte
+                result.append(words[8 * byte_index + low.bit_length() - 1])
+                byte ^= low
+        return result
+
+
+@lru_cache(maxsize=None)
+def load_wordle_index(path: str = "pages/words_for_wordle.txt", word_length: int = 5) -> WordleIndex:
+    """
+    Builds the index once per process; every session shares it and only keeps a bitset of its own.
+    """
+    return WordleIndex(load_word_store(path).words(word_length), word_length)
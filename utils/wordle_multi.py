@@ -0,0 +1,178 @@
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from utils.wordle import new_game_state, store_feedback_information
+from utils.wordle_index import WordleIndex, load_wordle_index
+from utils.wordle_opening_book import load_opening_book
+from utils.wordle_patterns import PatternTable, feedback_pattern, load_pattern_table, pattern_to_feedback
+from utils.wordle_strategies import GUESS_SHORTLIST, SAMPLED_ANSWERS, SAMPLED_CELLS, even_sample, expected_entropy, expected_remaining
+
+# Multi-board engine (Quordle / Octordle style): every guess is played on all boards at once, each board
+# having its own hidden answer, feedback and candidates. Any word length is supported.
+
+WORDS_PATH = "pages/words_for_wordle.txt"
+MATRIX_PATH = "pages/words_for_wordle.patterns"
+OTHER_LENGTHS_WORDS_PATH = "pages/words_for_letter_boxed.txt"  # word source for lengths other than 5
+BATCH_CELLS = 1 << 24  # guess x answer cells scored per batch, bounds the temporary arrays
+# without a precomputed matrix patterns are computed on the fly, so the shortlist is drawn from an even sample of guesses
+SAMPLED_GUESSES = 4096
+
+
+def words_path_for_length(word_length: int) -> str:
+    return WORDS_PATH if word_length == 5 else OTHER_LENGTHS_WORDS_PATH
+
+
+def multi_board_scores(table: PatternTable, guess_ids: np.ndarray, boards_answer_ids: Sequence[np.ndarray],
+                       weights: Optional[Sequence[int]] = None, score: str = "entropy") -> np.ndarray:
+    """
+    Scores every guess against the candidates of all boards, higher is better: the (weighted) sum over
+    boards of the expected information, or minus the sum of the expected candidates left. The candidates
+    of all boards are concatenated and the codes of board b are offset by b * n_patterns, so a batch of
+    guesses is histogrammed for every board with a single pattern lookup and a single bincount.
+    """
+    n_patterns = 3 ** table.encoded.shape[1]
+    n_boards = len(boards_answer_ids)
+    weights = np.ones(n_boards) if weights is None else np.asarray(weights, dtype=np.float64)
+    answer_ids = np.concatenate(boards_answer_ids)
+    board_offsets = np.repeat(np.arange(n_boards, dtype=np.int64) * n_patterns, [len(ids) for ids in boards_answer_ids])
+    batch_size = max(1, BATCH_CELLS // len(answer_ids))
+    scores = np.empty(len(guess_ids), dtype=np.float64)
+    for start in range(0, len(guess_ids), batch_size):
+        patterns = table.patterns(guess_ids[start:start + batch_size], answer_ids) + board_offsets
+        n_guesses = patterns.shape[0]
+        row_offsets = np.arange(n_guesses, dtype=np.int64)[:, None] * (n_boards * n_patterns)
+        histograms = np.bincount((patterns + row_offsets).ravel(), minlength=n_guesses * n_boards * n_patterns)
+        histograms = histograms.reshape(n_guesses * n_boards, n_patterns)
+        if score == "entropy":
+            board_scores = expected_entropy(histograms)
+        elif score == "expected_size":
+            board_scores = -expected_remaining(histograms)
+        else:
+            raise ValueError(f"Unknown score: {score}")
+        scores[start:start + batch_size] = board_scores.reshape(n_guesses, n_boards) @ weights
+    return scores
+
+
+def best_multi_guess(table: PatternTable, boards_possible_solutions: Sequence[Sequence[str]], from_all_words: bool = True,
+                     score: str = "entropy") -> str:
+    """
+    Returns the guess with the best score over the unsolved boards, given their possible solutions.
+    A board down to a single candidate is finished first. Boards with the same candidates are scored once
+    (weighted by their count); ties go to guesses that could be an answer, then to dictionary order.
+    As in best_guess, when the boards have more than SAMPLED_ANSWERS candidates in all (fewer without the
+    matrix), guesses are shortlisted on an even sample of every board and the GUESS_SHORTLIST best are scored
+    exactly. Without the matrix, the shortlist is drawn from an even sample of SAMPLED_GUESSES guesses.
+    """
+    boards_possible_solutions = [possible_solutions for possible_solutions in boards_possible_solutions if possible_solutions]
+    if not boards_possible_solutions:
+        raise ValueError("No possible words remain")
+    for possible_solutions in boards_possible_solutions:
+        if len(possible_solutions) == 1:
+            return possible_solutions[0]
+    groups: Dict[Tuple[str, ...], int] = {}
+    for possible_solutions in boards_possible_solutions:
+        key = tuple(possible_solutions)
+        groups[key] = groups.get(key, 0) + 1
+    boards_answer_ids = [table.ids(possible_solutions) for possible_solutions in groups]
+    is_candidate = np.zeros(len(table.words), dtype=bool)
+    for answer_ids in boards_answer_ids:
+        is_candidate[answer_ids] = True
+    guess_ids = np.arange(len(table.words)) if from_all_words else np.flatnonzero(is_candidate)
+    weights = list(groups.values())
+    sample_size = SAMPLED_ANSWERS if table.matrix is not None else max(GUESS_SHORTLIST, min(SAMPLED_ANSWERS, SAMPLED_CELLS // len(guess_ids)))
+    if sum(len(answer_ids) for answer_ids in boards_answer_ids) > sample_size and len(guess_ids) > GUESS_SHORTLIST:
+        if table.matrix is None:
+            guess_ids = even_sample(guess_ids, SAMPLED_GUESSES)
+        board_sample = max(1, sample_size // len(boards_answer_ids))
+        sample_scores = multi_board_scores(table, guess_ids, [even_sample(answer_ids, board_sample) for answer_ids in boards_answer_ids], weights, score)
+        guess_ids = guess_ids[np.argsort(-sample_scores, kind="stable")[:GUESS_SHORTLIST]]
+    scores = multi_board_scores(table, guess_ids, boards_answer_ids, weights, score)
+    order = np.lexsort((guess_ids, ~is_candidate[guess_ids], -np.round(scores, 9)))
+    return table.words[guess_ids[order[0]]]
+
+
+class MultiBoardGame:
+    """
+    Collected information of n_boards games played with shared guesses. Each board keeps the same state
+    as a single game (see new_game_state), plus whether it is solved and its (guess, feedback) history.
+    """
+    def __init__(self, n_boards: int = 4, word_length: int = 5, words_path: Optional[str] = None,
+                 index: Optional[WordleIndex] = None, pattern_table: Optional[PatternTable] = None):
+        words_path = words_path or words_path_for_length(word_length)
+        matrix_path = MATRIX_PATH if words_path == WORDS_PATH and word_length == 5 else None
+        self.word_length = word_length
+        self.uses_opening_book = words_path == WORDS_PATH and word_length == 5
+        self.index = index or load_wordle_index(words_path, word_length)
+        self.pattern_table = pattern_table or load_pattern_table(words_path, matrix_path, word_length)
+        self.boards = [new_game_state(self.index) for _ in range(n_boards)]
+        self.solved = [False] * n_boards
+        self.history: List[Tuple[str, List[List[str]]]] = []  # (guess, feedback of every board)
+
+    @property
+    def finished(self) -> bool:
+        return all(self.solved)
+
+    def possible_solutions(self, board: int) -> List[str]:
+        return self.index.words_from_bits(self.boards[board]["possible_solutions_bits"])
+
+    def unsolved_boards(self) -> List[int]:
+        return [board for board, solved in enumerate(self.solved) if not solved]
+
+    def suggest(self, from_all_words: bool = True, score: str = "entropy") -> str:
+        """
+        Suggests the next shared guess. While every unsolved board has received the same feedback, they all
+        have the same candidates and the single-board opening book answers (for 5-letter words).
+        """
+        unsolved = self.unsolved_boards()
+        if not unsolved:
+            raise ValueError("Every board is solved")
+        if score == "entropy" and self.uses_opening_book:
+            histories = {tuple(tuple(feedbacks[board]) for _, feedbacks in self.history) for board in unsolved}
+            if len(histories) == 1:
+                book = load_opening_book()
+                if book is not None:
+                    board = unsolved[0]
+                    choices = book.lookup(6 if from_all_words else 5, [(guess, feedbacks[board]) for guess, feedbacks in self.history])
+                    if choices is not None:
+                        return choices[0]
+        return best_multi_guess(self.pattern_table, [self.possible_solutions(board) for board in unsolved], from_all_words, score)
+
+    def store_feedback(self, guess: str, feedbacks: Sequence[Sequence[str]]) -> None:
+        """
+        Stores the feedback of a guess on every board (ignored for boards that are already solved).
+        A board whose feedback is all "Green" is solved.
+        """
+        if len(feedbacks) != len(self.boards):
+            raise ValueError(f"Expected {len(self.boards)} feedbacks, got {len(feedbacks)}")
+        self.history.append((guess, [list(feedback) for feedback in feedbacks]))
+        for board, feedback in enumerate(feedbacks):
+            if self.solved[board]:
+                continue
+            if all(colour == "Green" for colour in feedback):
+                self.solved[board] = True
+                guess_id = self.pattern_table.word_ids.get(guess)
+                if guess_id is not None:
+                    self.boards[board]["possible_solutions_bits"] = 1 << guess_id
+                continue
+            state = self.boards[board]
+            state["possible_solutions_bits"] = store_feedback_information(
+                guess, list(feedback), state["known_present_letters"], state["known_absent_letters"],
+                state["known_absent_letters_in_positions"], state["my_word"], state["possible_solutions_bits"], self.index)
+
+
+def play_multi_game(answers: Sequence[str], max_turns: int = 20, from_all_words: bool = True, score: str = "entropy",
+                    words_path: Optional[str] = None) -> Tuple[Optional[int], List[float]]:
+    """
+    Plays one game against one hidden answer per board. Returns the number of guesses needed to solve
+    every board (None if the game was abandoned) and the time taken by each suggestion in seconds.
+    """
+    game = MultiBoardGame(len(answers), len(answers[0]), words_path)
+    suggestion_times = []
+    for turn in range(1, max_turns + 1):
+        start_time = time.perf_counter()
+        guess = game.suggest(from_all_words, score)
+        suggestion_times.append(time.perf_counter() - start_time)
+        game.store_feedback(guess, [pattern_to_feedback(feedback_pattern(guess, answer), game.word_length) for answer in answers])
+        if game.finished:
+            return turn, suggestion_times
+    return None, suggestion_times
@@ -0,0 +1,141 @@
+import argparse
+import gzip
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+from utils.wordle_patterns import feedback_to_pattern, load_pattern_table, pattern_to_feedback, words_checksum
+
+# Opening book: the suggestions of the early turns, keyed by (strategy, feedback history), computed offline.
+# Usage: python -m utils.wordle_opening_book --strategies 3 4 5 6 7 --depth 2
+
+WORDS_PATH = "pages/words_for_wordle.txt"
+MATRIX_PATH = "pages/words_for_wordle.patterns"
+BOOK_PATH = "pages/words_for_wordle_opening_book.json.gz"
+BOOK_VERSION = 1
+
+
+def history_key(history: Sequence[Tuple[int, int]]) -> str:
+    # "guess_id:pattern,guess_id:pattern"; the empty string is the first turn
+    return ",".join(f"{guess_id}:{pattern}" for guess_id, pattern in history)
+
+
+class OpeningBook:
+    """
+    entries[strategy][history key] = ids of the words the strategy picks from at that point of the game
+    (a single id for the deterministic strategies).
+    """
+    def __init__(self, words: List[str], entries: Dict[int, Dict[str, List[int]]]):
+        self.words = words
+        self.word_ids = {word: i for i, word in enumerate(words)}
+        self.entries = entries
+
+    def lookup(self, strategy: int, history: Sequence[Tuple[str, Sequence[str]]]) -> Optional[List[str]]:
+        """
+        Returns the stored choices for a history of (guess, feedback) pairs, or None when the book does not
+        cover it (unknown strategy, deeper turn or unexpected guess).
+        """
+        strategy_entries = self.entries.get(strategy)
+        if strategy_entries is None:
+            return None
+        try:
+            key = history_key([(self.word_ids[guess], feedback_to_pattern(feedback)) for guess, feedback in history])
+        except KeyError:
+            return None
+        choices = strategy_entries.get(key)
+        return [self.words[i] for i in choices] if choices is not None else None
+
+    def to_json(self) -> Dict:
+        return {
+            "version": BOOK_VERSION,
+            "words": len(self.words),
+            "words_checksum": words_checksum(self.words),
+            "entries": {str(strategy): entries for strategy, entries in self.entries.items()},
+        }
+
+
+def build_opening_book(strategies: Sequence[int], depth: int = 2) -> OpeningBook:
+    """
+    Plays the first `depth` turns of every strategy with the headless solver core, following every feedback
+    pattern the possible solutions can produce. Random strategies only get their first turn, since later
+    turns depend on which word was drawn.
+    """
+    from utils.wordle import new_game_state, store_feedback_information, suggestion_choices, word_length
+    from utils.wordle_index import load_wordle_index
+    import numpy as np
+
+    index = load_wordle_index(WORDS_PATH, word_length)
+    pattern_table = load_pattern_table(WORDS_PATH, MATRIX_PATH, word_length)
+    all_green = 3 ** word_length - 1
+    entries: Dict[int, Dict[str, List[int]]] = {}
+    for strategy in strategies:
+        entries[strategy] = {}
+        # frontier items: (history of (guess id, pattern), game state)
+        frontier = [([], new_game_state(index))]
+        for turn in range(depth):
+            next_frontier = []
+            for history, state in frontier:
+                possible_solutions = index.words_from_bits(state["possible_solutions_bits"])
+                if not possible_solutions:
+                    continue
+                choices = suggestion_choices(strategy, possible_solutions, state["known_present_letters"],
+                                             state["known_absent_letters"], pattern_table.words, pattern_table,
+                                             time_budget=None)
+                entries[strategy][history_key(history)] = [pattern_table.word_ids[word] for word in choices]
+                if len(choices) != 1 or turn == depth - 1:
+                    continue
+                guess_id = pattern_table.word_ids[choices[0]]
+                for pattern in np.unique(pattern_table.patterns(np.array([guess_id]), pattern_table.ids(possible_solutions))):
+                    if pattern == all_green:
+                        continue
+                    child = {
+                        "known_present_letters": dict(state["known_present_letters"]),
+                        "known_absent_letters": list(state["known_absent_letters"]),
+                        "known_absent_letters_in_positions": {i: set(s) for i, s in state["known_absent_letters_in_positions"].items()},
+                        "my_word": list(state["my_word"]),
+                    }
+                    child["possible_solutions_bits"] = store_feedback_information(
+                        choices[0], pattern_to_feedback(int(pattern), word_length), child["known_present_letters"],
+                        child["known_absent_letters"], child["known_absent_letters_in_positions"], child["my_word"],
+                        state["possible_solutions_bits"], index)
+                    next_frontier.append((history + [(guess_id, int(pattern))], child))
+            frontier = next_frontier
+    return OpeningBook(pattern_table.words, entries)
+
+
+_book_cache: Dict[str, Optional[OpeningBook]] = {}
+_book_lock = threading.Lock()
+
+def load_opening_book(path: str = BOOK_PATH, words_path: str = WORDS_PATH) -> Optional[OpeningBook]:
+    """
+    Loads the book lazily, once per process. Returns None when there is no book, or when it was built for
+    a different word list.
+    """
+    with _book_lock:
+        if path not in _book_cache:
+            book = None
+            if os.path.exists(path):
+                with gzip.open(path, "rt") as f:
+                    data = json.load(f)
+                words = load_pattern_table(words_path).words
+                if data.get("version") == BOOK_VERSION and data.get("words_checksum") == words_checksum(words):
+                    book = OpeningBook(words, {int(strategy): entries for strategy, entries in data["entries"].items()})
+            _book_cache[path] = book
+        return _book_cache[path]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the Wordle opening book.")
+    parser.add_argument("--strategies", type=int, nargs="+", default=[3, 4, 5, 6, 7])
+    parser.add_argument("--depth", type=int, default=2, help="number of turns covered by the book")
+    parser.add_argument("--output", default=BOOK_PATH)
+    args = parser.parse_args()
+
+    book = build_opening_book(args.strategies, args.depth)
+    with gzip.open(args.output, "wt") as f:
+        json.dump(book.to_json(), f, separators=(",", ":"))
+    print(f"Saved {sum(len(entries) for entries in book.entries.values())} positions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import argparse
+import hashlib
+import os
+import struct
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from utils.word_store import load_word_store, open_or_build, pack_derived, unpack_derived
+
+# Feedback colours are encoded as base-3 digits, position i having weight 3**i:
+# "Black" = 0 (absent), "Orange" = 1 (present elsewhere), "Green" = 2 (correctly positioned)
+FEEDBACK_DIGITS = {"Black": 0, "Orange": 1, "Green": 2}
+DIGIT_FEEDBACK = {digit: feedback for feedback, digit in FEEDBACK_DIGITS.items()}
+
+WORDS_PATH = "pages/words_for_wordle.txt"
+MATRIX_PATH = "pages/words_for_wordle.patterns"
+
+# Pattern matrix file. Binary layout (little endian), after the derived-file header (see utils/word_store.py),
+# keyed on the word store:
+#   counts: word length (I), word count (I)
+#   codes:  pattern_dtype(word length)[word_count, word_count]  row = guess, column = answer, in word-list order
+MATRIX_MAGIC = b"WRDLPATS"
+MATRIX_VERSION = 1
+MATRIX_COUNTS = struct.Struct("<II")
+
+
+def matrix_path(words_path: str) -> str:
+    return os.path.splitext(words_path)[0] + ".patterns"
+
+
+def words_checksum(words: Sequence[str]) -> str:
+    return hashlib.sha1("\n".join(words).encode("ascii")).hexdigest()
+
+
+def pattern_dtype(word_length: int) -> np.dtype:
+    if 3 ** word_length <= 2 ** 8:
+        return np.dtype(np.uint8)
+    elif 3 ** word_length <= 2 ** 16:
+        return np.dtype(np.uint16)
+    return np.dtype(np.uint32)
+
+
+def feedback_to_pattern(feedback: Sequence[str]) -> int:
+    return sum(FEEDBACK_DIGITS[colour] * 3 ** i for i, colour in enumerate(feedback))
+
+
+def pattern_to_feedback(pattern: int, word_length: int = 5) -> List[str]:
+    return [DIGIT_FEEDBACK[(pattern // 3 ** i) % 3] for i in range(word_length)]
+
+
+def feedback_pattern(guess: str, answer: str) -> int:
+    """
+    Reference (scalar) implementation of the feedback rules. Greens are assigned first; then, from left to
+    right, a letter is Orange only while the answer still has unmatched copies of it, otherwise Black.
+    This is what store_feedback_information expects for repeated letters.
+    """
+    digits = [0] * len(guess)
+    unmatched = {}
+    for i, (g, a) in enumerate(zip(guess, answer)):
+        if g == a:
+            digits[i] = 2
+        else:
+            unmatched[a] = unmatched.get(a, 0) + 1
+    for i, g in enumerate(guess):
+        if digits[i] == 0 and unmatched.get(g, 0) > 0:
+            digits[i] = 1
+            unmatched[g] -= 1
+    return sum(digit * 3 ** i for i, digit in enumerate(digits))
+
+
+def encode_words(words: Sequence[str]) -> np.ndarray:
+    """
+    Returns the words as a (len(words), word_length) uint8 array of ASCII codes.
+    """
+    return np.frombuffer("".join(words).encode("ascii"), dtype=np.uint8).reshape(len(words), -1)
+
+
+def compute_patterns(guesses: np.ndarray, answers: np.ndarray) -> np.ndarray:
+    """
+    Vectorized feedback_pattern for every (guess, answer) pair of two encoded word arrays.
+    Returns a (len(guesses), len(answers)) array of base-3 codes.
+    A guess letter that is not green is orange when the answer has more copies of it than the guess already
+    claims: its copies at earlier positions (greens or oranges first), plus its greens at later positions.
+    """
+    word_length = guesses.shape[1]
+    dtype = pattern_dtype(word_length)
+    green = [guesses[:, i, None] == answers[None, :, i] for i in range(word_length)]     # (G, A) per position
+    # copies of each letter (by ASCII code) in each answer
+    counts = np.zeros((256, len(answers)), dtype=np.uint8)
+    columns = np.arange(len(answers))
+    for j in range(word_length):
+        counts[answers[:, j], columns] += 1
+    codes = np.zeros((len(guesses), len(answers)), dtype=dtype)
+    for i in range(word_length):
+        same = guesses == guesses[:, i, None]                                              # (G, L)
+        claimed = np.broadcast_to(same[:, :i].sum(axis=1, dtype=np.uint8)[:, None], codes.shape)
+        for j in range(i + 1, word_length):
+            if same[:, j].any():
+                claimed = claimed + (green[j] & same[:, j, None])
+        orange = ~green[i] & (counts[guesses[:, i]] > claimed)
+        codes += (green[i].astype(dtype) * 2 + orange) * dtype.type(3 ** i)
+    return codes
+
+
+def build_pattern_matrix(words: Sequence[str], chunk_size: int = 128, encoded: Optional[np.ndarray] = None) -> np.ndarray:
+    encoded = encode_words(words) if encoded is None else encoded
+    matrix = np.empty((len(words), len(words)), dtype=pattern_dtype(encoded.shape[1]))
+    for start in range(0, len(words), chunk_size):
+        matrix[start:start + chunk_size] = compute_patterns(encoded[start:start + chunk_size], encoded)
+    return matrix
+
+
+def load_words(path: str = WORDS_PATH, word_length: int = 5) -> List[str]:
+    return load_word_store(path).words(word_length)
+
+
+class PatternTable:
+    """
+    Feedback codes of guesses against answers for one word list. With the precomputed matrix (memory-mapped
+    by load_pattern_table, shared by every process through the OS page cache) a lookup is one fancy-indexing
+    operation; without it the requested block is computed on the fly.
+    """
+    def __init__(self, words: List[str], matrix: Optional[np.ndarray] = None, encoded: Optional[np.ndarray] = None):
+        self.words = words
+        self.word_ids: Dict[str, int] = {word: i for i, word in enumerate(words)}
+        self.encoded = encode_words(words) if encoded is None else encoded
+        self.matrix = matrix
+
+    def ids(self, words: Sequence[str]) -> np.ndarray:
+        return np.fromiter((self.word_ids[word] for word in words), dtype=np.int64, count=len(words))
+
+    def patterns(self, guess_ids: np.ndarray, answer_ids: np.ndarray) -> np.ndarray:
+        guess_ids = np.asarray(guess_ids)
+        answer_ids = np.asarray(answer_ids)
+        if self.matrix is not None:
+            # taking rows then columns (or columns then rows, whichever copies the smaller block first) is much
+            # faster than broadcast fancy indexing
+            if len(guess_ids) <= len(answer_ids):
+                return np.take(self.matrix[guess_ids], answer_ids, axis=1)
+            return np.take(self.matrix, answer_ids, axis=1)[guess_ids]
+        return compute_patterns(self.encoded[guess_ids], self.encoded[answer_ids])
+
+    def answer_columns(self, answer_ids: np.ndarray) -> np.ndarray:
+        """
+        Returns the codes of every word, as a guess, against the given answers: a (words, answers) block.
+        """
+        answer_ids = np.asarray(answer_ids)
+        if self.matrix is not None:
+            return np.take(self.matrix, answer_ids, axis=1)
+        return compute_patterns(self.encoded, self.encoded[answer_ids])
+
+
+def build_matrix_bytes(words: List[str], encoded: np.ndarray, source_checksum: int) -> bytes:
+    matrix = build_pattern_matrix(words, encoded=encoded)
+    return pack_derived(MATRIX_MAGIC, MATRIX_VERSION, source_checksum, MATRIX_COUNTS.pack(encoded.shape[1], len(words)) + matrix.tobytes())
+
+
+def open_or_build_matrix(matrix_path: str, words: List[str], encoded: np.ndarray, source_checksum: int) -> np.ndarray:
+    """
+    Returns the memory-mapped pattern matrix of the words, building it first (about 10 s for the Wordle
+    list) when the file is missing, corrupted or was built from another word store.
+    """
+    word_length = encoded.shape[1]
+
+    def loader(buffer, verify: bool) -> np.ndarray:
+        _, matrix_source, payload = unpack_derived(buffer, MATRIX_MAGIC, MATRIX_VERSION, "Wordle pattern matrix", verify)
+        if matrix_source != source_checksum or MATRIX_COUNTS.unpack_from(payload) != (word_length, len(words)):
+            raise ValueError("Wordle pattern matrix of another word list")
+        codes = np.frombuffer(payload, dtype=pattern_dtype(word_length), offset=MATRIX_COUNTS.size)
+        return codes.reshape(len(words), len(words))
+
+    return open_or_build(matrix_path, lambda: build_matrix_bytes(words, encoded, source_checksum), loader)
+
+
+_tables: Dict[tuple, Tuple[int, PatternTable]] = {}
+_tables_lock = threading.Lock()
+
+def load_pattern_table(words_path: str = WORDS_PATH, matrix_path: Optional[str] = MATRIX_PATH, word_length: int = 5) -> PatternTable:
+    """
+    Returns the process-wide PatternTable of the words of the given length. With a matrix_path, the matrix is
+    serialized there (built on first use, rebuilt when the word store changes) and memory-mapped once per
+    process; without one, patterns are computed on the fly.
+    """
+    key = (words_path, matrix_path, word_length)
+    store = load_word_store(words_path)
+    with _tables_lock:
+        cached = _tables.get(key)
+        if cached is None or cached[0] != store.checksum:
+            # the encoded words are a read-only view of the word store's letter codes
+            encoded = np.frombuffer(store.letter_codes(word_length), dtype=np.uint8).reshape(-1, word_length)
+            words = store.words(word_length)
+            matrix = open_or_build_matrix(matrix_path, words, encoded, store.checksum) if matrix_path is not None else None
+            _tables[key] = (store.checksum, PatternTable(words, matrix, encoded))
+        return _tables[key][1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Wordle guess x answer feedback-pattern matrix.")
+    parser.add_argument("--words", default=WORDS_PATH)
+    parser.add_argument("--output", default=MATRIX_PATH)
+    parser.add_argument("--word-length", type=int, default=5)
+    args = parser.parse_args()
+
+    matrix = load_pattern_table(args.words, args.output, args.word_length).matrix
+    print(f"{args.output}: {matrix.shape[0]}x{matrix.shape[1]} {matrix.dtype} pattern matrix")
+
+
+if __name__ == "__main__":
+    main()
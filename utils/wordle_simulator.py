@@ -0,0 +1,126 @@
+import argparse
+import json
+import os
+import platform
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from utils.wordle import MATRIX_PATH, STRATEGIES, WORDS_PATH, new_game_state, store_feedback_information, suggest_word, word_length
+from utils.wordle_index import load_wordle_index
+from utils.wordle_patterns import feedback_pattern, load_pattern_table, pattern_to_feedback
+
+# Offline benchmark: every word of the list is played as the hidden answer with each strategy.
+# Usage: python -m utils.wordle_simulator --strategies 3 5 6 --output wordle_benchmark.json
+
+MAX_GUESSES = 6     # a game not solved within this many guesses counts as a failure
+MAX_TURNS = 20      # games are abandoned after this many guesses
+
+
+def play_game(answer: str, strategy: int, seed: int = 0, max_turns: int = MAX_TURNS) -> Tuple[Optional[int], List[float]]:
+    """
+    Plays one game against the hidden answer. Returns the number of guesses needed (None if the game was
+    abandoned) and the time taken by each suggestion in seconds.
+    """
+    index = load_wordle_index(WORDS_PATH, word_length)
+    pattern_table = load_pattern_table(WORDS_PATH, MATRIX_PATH, word_length)
+    rng = random.Random(f"{seed}:{strategy}:{answer}")
+    state = new_game_state(index)
+    suggestion_times = []
+    history = []
+    for turn in range(1, max_turns + 1):
+        possible_solutions = index.words_from_bits(state["possible_solutions_bits"])
+        if not possible_solutions:
+            break
+        start_time = time.perf_counter()
+        guess = suggest_word(strategy, possible_solutions, state["known_present_letters"], state["known_absent_letters"],
+                             all_words=pattern_table.words, pattern_table=pattern_table, rng=rng, history=history)
+        suggestion_times.append(time.perf_counter() - start_time)
+        if guess == answer:
+            return turn, suggestion_times
+        feedback = pattern_to_feedback(feedback_pattern(guess, answer), word_length)
+        history.append((guess, feedback))
+        state["possible_solutions_bits"] = store_feedback_information(
+            guess, feedback, state["known_present_letters"], state["known_absent_letters"],
+            state["known_absent_letters_in_positions"], state["my_word"], state["possible_solutions_bits"], index)
+    return None, suggestion_times
+
+
+def _play_games(args: Tuple[Sequence[str], int, int]) -> Tuple[List[Optional[int]], List[float]]:
+    answers, strategy, seed = args
+    guesses, suggestion_times = [], []
+    for answer in answers:
+        n_guesses, times = play_game(answer, strategy, seed)
+        guesses.append(n_guesses)
+        suggestion_times += times
+    return guesses, suggestion_times
+
+
+def simulate_strategy(strategy: int, answers: Sequence[str], workers: Optional[int] = None, seed: int = 0, chunk_size: int = 64) -> Dict:
+    """
+    Plays every answer with one strategy across a process pool and summarizes the results.
+    """
+    chunks = [(answers[i:i + chunk_size], strategy, seed) for i in range(0, len(answers), chunk_size)]
+    guesses, suggestion_times = [], []
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_guesses, chunk_times in executor.map(_play_games, chunks):
+            guesses += chunk_guesses
+            suggestion_times += chunk_times
+    wall_time = time.perf_counter() - start_time
+
+    solved = [n for n in guesses if n is not None]
+    distribution = Counter(solved)
+    times_ms = np.array(suggestion_times) * 1000
+    return {
+        "strategy": strategy,
+        "description": STRATEGIES[strategy],
+        "games": len(guesses),
+        "guess_distribution": {str(n): distribution[n] for n in sorted(distribution)},
+        "unsolved": len(guesses) - len(solved),
+        "failure_rate": sum(1 for n in guesses if n is None or n > MAX_GUESSES) / len(guesses),
+        "mean_guesses_when_solved": sum(solved) / len(solved) if solved else None,
+        "suggestions": len(suggestion_times),
+        "suggestion_time_ms": {
+            "p50": float(np.percentile(times_ms, 50)) if len(times_ms) else None,
+            "p99": float(np.percentile(times_ms, 99)) if len(times_ms) else None,
+            "max": float(times_ms.max()) if len(times_ms) else None,
+        },
+        "wall_time_s": wall_time,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Wordle strategies over the full answer list.")
+    parser.add_argument("--strategies", type=int, nargs="+", default=list(STRATEGIES), choices=list(STRATEGIES))
+    parser.add_argument("--limit", type=int, default=None, help="only play the first N answers of the list")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="wordle_benchmark.json")
+    args = parser.parse_args()
+
+    answers = load_wordle_index(WORDS_PATH, word_length).words[:args.limit]
+    results = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "words": len(answers),
+        "max_guesses": MAX_GUESSES,
+        "seed": args.seed,
+        "strategies": [],
+    }
+    for strategy in args.strategies:
+        summary = simulate_strategy(strategy, answers, args.workers, args.seed)
+        results["strategies"].append(summary)
+        print(f"Strategy {strategy}: failure rate {summary['failure_rate']:.3f}, "
+              f"mean guesses {summary['mean_guesses_when_solved']}, "
+              f"p50 {summary['suggestion_time_ms']['p50']} ms, p99 {summary['suggestion_time_ms']['p99']} ms")
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
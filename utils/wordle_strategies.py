@@ -0,0 +1,229 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Sequence, Tuple
+import numpy as np
+from utils.wordle_patterns import PatternTable
+
+GUESS_CHUNK_SIZE = 1024
+COLUMN_CELLS = 1 << 25          # (words x answers) codes up to which the answer columns are gathered once
+SAMPLED_ANSWERS = 1024          # larger candidate sets are scored on an even sample of this size first...
+GUESS_SHORTLIST = 64            # ...and only this many best guesses are rescored against every candidate
+COMPUTED_CELLS = 1 << 18        # (guesses x answers) codes computed on the fly, without the matrix, per deadline check
+SAMPLED_CELLS = 1 << 22         # without the matrix, the answer sample is sized to about this many codes
+
+
+def pattern_histograms(patterns: np.ndarray, n_patterns: int) -> np.ndarray:
+    """
+    Returns, for each row (guess) of a pattern block, how many answers produce each feedback code.
+    All rows are counted with a single bincount by offsetting the codes of row r by r * n_patterns.
+    """
+    n_guesses = patterns.shape[0]
+    offsets = np.arange(n_guesses, dtype=np.int64)[:, None] * n_patterns
+    return np.bincount((patterns + offsets).ravel(), minlength=n_guesses * n_patterns).reshape(n_guesses, n_patterns)
+
+
+def expected_entropy(histograms: np.ndarray) -> np.ndarray:
+    """
+    Expected information (bits) of each guess: log2(n) - sum(c * log2(c)) / n over its feedback buckets.
+    """
+    n = histograms.sum(axis=1)
+    # c * log2(c) of every bucket size, computed once and looked up per cell
+    sizes = np.arange(histograms.max() + 1, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        c_log_c = np.where(sizes > 0, sizes * np.log2(sizes), 0.0)
+    return np.log2(n) - c_log_c[histograms].sum(axis=1) / n
+
+
+def expected_remaining(histograms: np.ndarray) -> np.ndarray:
+    """
+    Expected number of candidates left after each guess: sum(c ** 2) / n.
+    """
+    n = histograms.sum(axis=1)
+    return (histograms.astype(np.float64) ** 2).sum(axis=1) / n
+
+
+def even_sample(ids: np.ndarray, size: int) -> np.ndarray:
+    if len(ids) <= size:
+        return ids
+    return ids[np.linspace(0, len(ids) - 1, size).astype(np.int64)]
+
+
+def score_guesses(table: PatternTable, guess_ids: np.ndarray, answer_ids: np.ndarray, score: str = "entropy") -> np.ndarray:
+    """
+    Scores every guess against the candidate answers, higher is better. Guesses are processed in chunks so
+    that the temporary pattern block stays small even for a full-dictionary suggestion. With the precomputed
+    matrix, the answer columns are gathered once and each chunk is a row selection of them.
+    """
+    n_patterns = 3 ** table.encoded.shape[1]
+    columns = None
+    if table.matrix is not None and len(guess_ids) > GUESS_CHUNK_SIZE and len(table.words) * len(answer_ids) <= COLUMN_CELLS:
+        columns = table.answer_columns(answer_ids)
+    scores = np.empty(len(guess_ids), dtype=np.float64)
+    for start in range(0, len(guess_ids), GUESS_CHUNK_SIZE):
+        chunk = guess_ids[start:start + GUESS_CHUNK_SIZE]
+        histograms = pattern_histograms(columns[chunk] if columns is not None else table.patterns(chunk, answer_ids), n_patterns)
+        if score == "entropy":
+            scores[start:start + GUESS_CHUNK_SIZE] = expected_entropy(histograms)
+        elif score == "expected_size":
+            scores[start:start + GUESS_CHUNK_SIZE] = -expected_remaining(histograms)
+        else:
+            raise ValueError(f"Unknown score: {score}")
+    return scores
+
+
+def best_guess(table: PatternTable, possible_solutions: Sequence[str], from_all_words: bool, score: str = "entropy") -> str:
+    """
+    Returns the guess with the best score against the possible solutions, chosen among the possible solutions
+    or among all words. Ties go to guesses that could be the answer, then to dictionary order. Above
+    SAMPLED_ANSWERS candidates (fewer without the matrix, see SAMPLED_CELLS), guesses are shortlisted on an
+    even sample of them, and the GUESS_SHORTLIST best are scored exactly.
+    """
+    answer_ids = table.ids(possible_solutions)
+    if len(answer_ids) <= 2:
+        return possible_solutions[0]
+    guess_ids = np.arange(len(table.words)) if from_all_words else answer_ids
+    sample_size = SAMPLED_ANSWERS if table.matrix is not None else max(GUESS_SHORTLIST, min(SAMPLED_ANSWERS, SAMPLED_CELLS // len(guess_ids)))
+    if len(answer_ids) > sample_size and len(guess_ids) > GUESS_SHORTLIST:
+        sample_scores = score_guesses(table, guess_ids, even_sample(answer_ids, sample_size), score)
+        guess_ids = guess_ids[np.argsort(-sample_scores, kind="stable")[:GUESS_SHORTLIST]]
+    scores = score_guesses(table, guess_ids, answer_ids, score)
+    is_candidate = np.zeros(len(table.words), dtype=bool)
+    is_candidate[answer_ids] = True
+    # lexsort sorts by the last key first: best score, then candidates, then lowest id
+    order = np.lexsort((guess_ids, ~is_candidate[guess_ids], -np.round(scores, 9)))
+    return table.words[guess_ids[order[0]]]
+
+
+#region Minimax
+MINIMAX_TIME_BUDGET = 1.0       # seconds; the best guess found so far is returned when it runs out
+MINIMAX_EXACT_LIMIT = 64        # candidate sets up to this size are searched for a guaranteed solve
+MINIMAX_BRANCHING = 32          # guesses tried at each node of the exact search
+MINIMAX_CACHE_SIZE = 4096
+
+_minimax_cache: "OrderedDict[bytes, Tuple[int, int]]" = OrderedDict()
+_minimax_cache_lock = threading.Lock()
+
+
+def _candidate_key(answer_ids: np.ndarray) -> bytes:
+    return hashlib.blake2b(np.sort(answer_ids).astype(np.int32).tobytes(), digest_size=16).digest()
+
+
+def _cache_get(key: bytes) -> Optional[Tuple[int, int]]:
+    with _minimax_cache_lock:
+        value = _minimax_cache.get(key)
+        if value is not None:
+            _minimax_cache.move_to_end(key)
+        return value
+
+
+def _cache_put(key: bytes, value: Tuple[int, int]) -> None:
+    with _minimax_cache_lock:
+        _minimax_cache[key] = value
+        _minimax_cache.move_to_end(key)
+        while len(_minimax_cache) > MINIMAX_CACHE_SIZE:
+            _minimax_cache.popitem(last=False)
+
+
+def worst_case_sizes(table: PatternTable, guess_ids: np.ndarray, answer_ids: np.ndarray, deadline: Optional[float] = None) -> np.ndarray:
+    """
+    Largest feedback bucket of each guess, i.e. the worst-case number of candidates left after it.
+    Guesses not reached before the deadline get len(answer_ids) + 1. Without the matrix, the patterns are
+    computed in chunks of about COMPUTED_CELLS codes so that the deadline is checked often enough.
+    """
+    n_patterns = 3 ** table.encoded.shape[1]
+    sizes = np.full(len(guess_ids), len(answer_ids) + 1, dtype=np.int64)
+    chunk_size = GUESS_CHUNK_SIZE if table.matrix is not None else max(1, COMPUTED_CELLS // len(answer_ids))
+    for start in range(0, len(guess_ids), chunk_size):
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+        histograms = pattern_histograms(table.patterns(guess_ids[start:start + chunk_size], answer_ids), n_patterns)
+        sizes[start:start + chunk_size] = histograms.max(axis=1)
+    return sizes
+
+
+def _ordered_guesses(table: PatternTable, answer_ids: np.ndarray, deadline: Optional[float]) -> Tuple[np.ndarray, np.ndarray]:
+    # candidates are scanned first so that a good guess is known early if the budget runs out;
+    # the result is ordered by worst-case size, then candidates first, then dictionary order
+    if deadline is not None and time.perf_counter() > deadline:
+        # out of time: no guess is scored, the candidates come back in dictionary order
+        guess_ids = np.sort(answer_ids)
+        return guess_ids, np.full(len(guess_ids), len(answer_ids) + 1, dtype=np.int64)
+    is_candidate = np.zeros(len(table.words), dtype=bool)
+    is_candidate[answer_ids] = True
+    guess_ids = np.concatenate([np.sort(answer_ids), np.flatnonzero(~is_candidate)])
+    sizes = worst_case_sizes(table, guess_ids, answer_ids, deadline)
+    order = np.lexsort((guess_ids, ~is_candidate[guess_ids], sizes))
+    return guess_ids[order], sizes[order]
+
+
+def _guesses_needed(table: PatternTable, answer_ids: np.ndarray, beta: int, deadline: Optional[float]) -> Tuple[int, int]:
+    """
+    Returns (n, guess id) where n is the number of guesses that guarantees a solve for these candidates,
+    starting with that guess. Branches that cannot beat beta are cut (alpha-beta style), in which case
+    n >= beta is returned. Only the MINIMAX_BRANCHING best guesses by worst-case size are tried.
+    """
+    if len(answer_ids) == 1:
+        return 1, int(answer_ids[0])
+    if beta <= 2:
+        # two or more candidates always need at least two guesses
+        return beta, int(answer_ids[0])
+    key = _candidate_key(answer_ids)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    all_green = 3 ** table.encoded.shape[1] - 1
+    guess_ids, _ = _ordered_guesses(table, answer_ids, deadline)
+    best, best_guess_id, exact = beta, int(guess_ids[0]), True
+    for guess_id in guess_ids[:MINIMAX_BRANCHING]:
+        if deadline is not None and time.perf_counter() > deadline:
+            exact = False
+            break
+        patterns = table.patterns(np.array([guess_id]), answer_ids)[0]
+        buckets = [answer_ids[patterns == pattern] for pattern in np.unique(patterns) if pattern != all_green]
+        if len(buckets) == 1 and len(buckets[0]) == len(answer_ids):
+            continue  # the guess gives no information
+        buckets.sort(key=len, reverse=True)
+        worst = 1
+        for bucket in buckets:
+            worst = max(worst, 1 + _guesses_needed(table, bucket, best - 1, deadline)[0])
+            if worst >= best:
+                break
+        if worst < best:
+            best, best_guess_id = worst, int(guess_id)
+            if best <= 2:
+                break
+    if deadline is not None and time.perf_counter() > deadline:
+        exact = False
+    if best < beta and exact:
+        # a value below beta is exact; cut-off values depend on beta and are not cached
+        _cache_put(key, (best, best_guess_id))
+    return best, best_guess_id
+
+
+def minimax_guess(table: PatternTable, possible_solutions: Sequence[str], time_budget: Optional[float] = MINIMAX_TIME_BUDGET) -> str:
+    """
+    Returns the guess that minimizes the worst case. Small candidate sets are searched for the guess that
+    guarantees a solve in the fewest guesses; larger ones use the guess with the smallest worst-case bucket.
+    Results are cached by candidate set, and when the time budget runs out the best guess found so far is returned.
+    """
+    answer_ids = table.ids(possible_solutions)
+    if len(answer_ids) <= 2:
+        return possible_solutions[0]
+    deadline = time.perf_counter() + time_budget if time_budget is not None else None
+
+    if len(answer_ids) <= MINIMAX_EXACT_LIMIT:
+        _, guess_id = _guesses_needed(table, answer_ids, MINIMAX_EXACT_LIMIT + 1, deadline)
+        return table.words[guess_id]
+
+    key = _candidate_key(answer_ids)
+    cached = _cache_get(key)
+    if cached is not None:
+        return table.words[cached[1]]
+    guess_ids, sizes = _ordered_guesses(table, answer_ids, deadline)
+    if deadline is None or time.perf_counter() <= deadline:
+        _cache_put(key, (int(sizes[0]), int(guess_ids[0])))
+    return table.words[guess_ids[0]]
+#endregion Minimax